@@ -0,0 +1,7 @@
+"""
+Tooling for the Hyrum Smith Liberty Jail Journal digital edition.
+
+Every tool is a subcommand of the `journal` command (see journal/cli.py);
+the modules here hold the implementations and can also be imported directly.
+"""
+__version__ = "0.1.0"
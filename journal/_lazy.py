@@ -0,0 +1,35 @@
+"""
+Deferred imports for heavy optional dependencies (OpenCV, NumPy).
+
+Modules bind `cv2 = lazy_import("cv2", ...)` at top level as before, but the
+real import only happens on first attribute access, so `--help` and text-only
+commands never pay for it.
+"""
+from __future__ import annotations
+import importlib
+import types
+
+IMAGE_DEPS_HINT = "OpenCV (cv2) and numpy are required. Install with: pip install opencv-python-headless numpy"
+
+
+class MissingDependency(ImportError):
+    pass
+
+
+class _LazyModule(types.ModuleType):
+    def __init__(self, name: str, hint: str):
+        super().__init__(name)
+        self._lazy_hint = hint
+
+    def __getattr__(self, attr: str):
+        # Only reached for attributes not yet copied from the real module
+        try:
+            module = importlib.import_module(self.__name__)
+        except ImportError as e:
+            raise MissingDependency(f"{self._lazy_hint} ({e})") from e
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str, hint: str = IMAGE_DEPS_HINT) -> types.ModuleType:
+    return _LazyModule(name, hint)
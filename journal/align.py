@@ -0,0 +1,282 @@
+"""
+Aligns each entry's Diplomatic transcription with its Modernized text, token by
+token, to build a spelling-variant dictionary and flag lines where the two
+versions disagree.
+
+Alignment is a weighted edit distance over tokens: identical words cost 0,
+spelling variants cost in proportion to their character edit distance, and an
+unmatched word costs 1. Both levels (characters within a token pair, tokens
+within an entry) use the same banded dynamic program, computed a row at a time
+with NumPy. The Modernized text is one paragraph per page, so the whole entry is
+aligned at once and the result is then read back per Diplomatic line.
+
+Alignments are cached per entry in .cache/align/ by a hash of both sections and
+only recomputed when either changes.
+
+Usage:
+  journal align                          # summary for every entry
+  journal align 1839-04-01 --show        # line-by-line alignment
+  journal align --variants               # historical spelling -> modern form
+  journal align --variants -o variants.json
+  journal align --flagged --threshold 0.6
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import re
+from collections import Counter, defaultdict
+from dataclasses import astuple, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ._lazy import lazy_import
+from .paths import CACHE_DIR, DATE_RE, TRANSCRIPTS_DIR
+from .transcript import WORD_RE, diplomatic_body, modernized_body, tokenize
+
+np = lazy_import("numpy", "numpy is required for alignment. Install with: pip install numpy")
+
+ALIGN_CACHE = CACHE_DIR / "align"
+# Bump when costs or tokenization change so cached alignments are recomputed
+ALIGN_VERSION = "3"
+# Words plus the ampersand, which the editors expand to "and"
+TOKEN_RE = re.compile(WORD_RE.pattern + r"|&")
+# Abbreviations expanded rather than respelled; aligned as near-identical
+EQUIVALENTS = {"&": "and"}
+GAP = 1.0
+# Token pairs cheaper than this are spelling variants; dearer ones are editorial rewordings
+VARIANT_MAX_COST = 1.0
+DEFAULT_BAND = 12
+
+
+@dataclass
+class Op:
+    kind: str  # "=" same, "~" spelling variant, "x" reworded, "-" dropped, "+" added
+    dip: str
+    mod: str
+    line: int  # Diplomatic body line the op belongs to
+    cost: float
+
+
+def banded_table(n: int, m: int, cost_row: Callable[[int, int, int], "np.ndarray"], band: int) -> "np.ndarray":
+    """Edit-distance table for sequences of length n and m with unit gaps.
+
+    `cost_row(i, lo, hi)` returns substitution costs of item i of the first
+    sequence against items lo..hi-1 of the second. Cells further than `band`
+    from the (scaled) diagonal are left at infinity. Each row is computed with
+    vector operations: the insertion recurrence D[i,j] = min(E[j], D[i,j-1] + gap)
+    is a running minimum of E[k] - gap*k.
+    """
+    # Wide enough that consecutive rows overlap when one side is much longer
+    band = max(band, -(-m // max(n, 1)) + 1)
+    table = np.full((n + 1, m + 1), np.inf)
+    hi0 = m if n == 0 else min(m, band)
+    table[0, : hi0 + 1] = GAP * np.arange(hi0 + 1)
+    for i in range(1, n + 1):
+        centre = i * m / n
+        lo = max(0, int(np.ceil(centre)) - band)
+        hi = min(m, int(centre) + band)
+        prev = table[i - 1]
+        best = prev[lo : hi + 1] + GAP  # drop item i-1
+        s = max(lo, 1)
+        if s <= hi:
+            diag = prev[s - 1 : hi] + cost_row(i - 1, s - 1, hi)
+            best[s - lo :] = np.minimum(best[s - lo :], diag)
+        ramp = GAP * np.arange(lo, hi + 1)
+        table[i, lo : hi + 1] = np.minimum.accumulate(best - ramp) + ramp
+    return table
+
+
+@lru_cache(maxsize=65536)
+def char_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two words."""
+    if a == b:
+        return 0
+    if not a or not b:
+        return len(a) or len(b)
+    ca = np.frombuffer(a.encode("utf-32-le"), dtype=np.uint32)
+    cb = np.frombuffer(b.encode("utf-32-le"), dtype=np.uint32)
+    table = banded_table(len(ca), len(cb), lambda i, lo, hi: (cb[lo:hi] != ca[i]).astype(float), max(len(ca), len(cb)))
+    return int(table[-1, -1])
+
+
+def normalize(token: str) -> str:
+    return token.lower().replace("’", "'")
+
+
+@lru_cache(maxsize=65536)
+def token_cost(a: str, b: str) -> float:
+    """Substitution cost for two normalized tokens, from 0 (same) to 2 (a drop plus an add)."""
+    if a == b:
+        return 0.0
+    if EQUIVALENTS.get(a) == b:
+        return 0.1
+    return 2.0 * char_distance(a, b) / max(len(a), len(b))
+
+
+def align_sequences(dip: List[Tuple[int, str]], mod: List[Tuple[int, str]], band: int = DEFAULT_BAND) -> List[Op]:
+    """Aligns (line, token) sequences. Added Modernized words are attached to the preceding Diplomatic line."""
+    a = [normalize(t) for _, t in dip]
+    b = [normalize(t) for _, t in mod]
+    n, m = len(a), len(b)
+
+    def cost_row(i: int, lo: int, hi: int) -> "np.ndarray":
+        return np.fromiter((token_cost(a[i], b[j]) for j in range(lo, hi)), dtype=float, count=hi - lo)
+
+    table = banded_table(n, m, cost_row, band)
+    ops: List[Op] = []
+    i, j = n, m
+    while i or j:
+        here = table[i, j]
+        if i and j:
+            c = token_cost(a[i - 1], b[j - 1])
+            if abs(table[i - 1, j - 1] + c - here) < 1e-9:
+                kind = "=" if c == 0 else "~" if c < VARIANT_MAX_COST else "x"
+                ops.append(Op(kind, dip[i - 1][1], mod[j - 1][1], dip[i - 1][0], c))
+                i, j = i - 1, j - 1
+                continue
+        if i and abs(table[i - 1, j] + GAP - here) < 1e-9:
+            ops.append(Op("-", dip[i - 1][1], "", dip[i - 1][0], GAP))
+            i -= 1
+        else:
+            ops.append(Op("+", "", mod[j - 1][1], 0, GAP))
+            j -= 1
+    ops.reverse()
+
+    line = dip[0][0] if dip else 0
+    for op in ops:
+        if op.kind == "+":
+            op.line = line
+        else:
+            line = op.line
+    return ops
+
+
+def entry_digest(dip_body: str, mod_body: str, band: int) -> str:
+    h = hashlib.sha256()
+    for part in (ALIGN_VERSION, str(band), dip_body, mod_body):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def align_entry(path: Path, band: int = DEFAULT_BAND, cache_dir: Path = ALIGN_CACHE) -> Tuple[List[Op], str]:
+    """Returns (ops, Diplomatic body) for one transcript, using the per-entry cache when current."""
+    text = path.read_text(encoding="utf-8")
+    dip_body, mod_body = diplomatic_body(text), modernized_body(text)
+    digest = entry_digest(dip_body, mod_body, band)
+    cache_file = cache_dir / f"{path.stem}.json"
+    if cache_file.exists():
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+            if data.get("digest") == digest:
+                return [Op(*row) for row in data["ops"]], dip_body
+        except (ValueError, KeyError, TypeError):
+            pass
+    ops = align_sequences(list(tokenize(dip_body, TOKEN_RE)), list(tokenize(mod_body, TOKEN_RE)), band)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache_file.write_text(json.dumps({"digest": digest, "ops": [astuple(op) for op in ops]}), encoding="utf-8")
+    return ops, dip_body
+
+
+def line_scores(ops: List[Op]) -> Dict[int, float]:
+    """Mean alignment cost per Diplomatic word for each Diplomatic line."""
+    cost: Dict[int, float] = defaultdict(float)
+    words: Counter = Counter()
+    for op in ops:
+        cost[op.line] += op.cost
+        if op.kind != "+":
+            words[op.line] += 1
+    return {line: cost[line] / max(words[line], 1) for line in cost}
+
+
+def build_variants(results: Dict[str, List[Op]]) -> Dict[str, Dict[str, int]]:
+    """Historical spelling -> {modern form: occurrences} across the corpus."""
+    variants: Dict[str, Counter] = defaultdict(Counter)
+    for ops in results.values():
+        for op in ops:
+            if op.kind == "~":
+                variants[normalize(op.dip)][op.mod] += 1
+    return {k: dict(v.most_common()) for k, v in sorted(variants.items())}
+
+
+def show_entry(date: str, ops: List[Op], dip_body: str, threshold: float) -> None:
+    lines = dip_body.splitlines()
+    scores = line_scores(ops)
+    by_line: Dict[int, List[Op]] = defaultdict(list)
+    for op in ops:
+        by_line[op.line].append(op)
+    print(f"== {date}")
+    for line in sorted(by_line):
+        mark = "!" if scores[line] > threshold else " "
+        dip = " ".join(op.dip for op in by_line[line] if op.dip)
+        mod = " ".join(op.mod for op in by_line[line] if op.mod)
+        notes = ", ".join(f"{op.dip}→{op.mod}" for op in by_line[line] if op.kind in "~x")
+        src = lines[line - 1].strip() if 0 < line <= len(lines) else ""
+        print(f"{mark}{line:>4}  {src or dip}")
+        print(f"       {mod}" + (f"   [{notes}]" if notes else ""))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Align Diplomatic and Modernized transcriptions token by token")
+    p.add_argument("dates", nargs="*", help="Entries to align (default: all)")
+    p.add_argument("--show", action="store_true", help="Print each entry's alignment line by line")
+    p.add_argument("--variants", action="store_true", help="Print the spelling-variant dictionary")
+    p.add_argument("-o", "--output", type=Path, help="Write the variant dictionary as JSON")
+    p.add_argument("--flagged", action="store_true", help="List only lines whose versions disagree")
+    p.add_argument("--threshold", type=float, default=0.5, help="Mean cost per word above which a line is flagged (default 0.5)")
+    p.add_argument("--band", type=int, default=DEFAULT_BAND, help=f"Alignment band width in tokens (default {DEFAULT_BAND})")
+    args = p.parse_args(argv)
+
+    for d in args.dates:
+        if not DATE_RE.match(d):
+            p.error(f"not a date: {d}")
+    paths = [TRANSCRIPTS_DIR / f"{d}.md" for d in args.dates] or sorted(TRANSCRIPTS_DIR.glob("*.md"))
+    results: Dict[str, List[Op]] = {}
+    bodies: Dict[str, str] = {}
+    for path in paths:
+        if not DATE_RE.match(path.stem):
+            continue
+        if not path.exists():
+            print(f"No transcript for {path.stem}")
+            return 1
+        results[path.stem], bodies[path.stem] = align_entry(path, args.band)
+
+    if args.variants or args.output:
+        variants = build_variants(results)
+        if args.output:
+            args.output.write_text(json.dumps(variants, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+            print(f"Wrote {len(variants)} variant(s) to {args.output}")
+        if args.variants:
+            for dip, forms in variants.items():
+                print(f"{dip:<16} " + ", ".join(f"{form} ({n})" for form, n in forms.items()))
+        return 0
+
+    if args.show:
+        for date, ops in results.items():
+            if ops:
+                show_entry(date, ops, bodies[date], args.threshold)
+        return 0
+
+    if args.flagged:
+        for date, ops in results.items():
+            lines = bodies[date].splitlines()
+            for line, score in sorted(line_scores(ops).items()):
+                if score > args.threshold and 0 < line <= len(lines):
+                    print(f"{date}:{line:<4} {score:4.2f}  {lines[line - 1].strip()}")
+        return 0
+
+    print(f"{'Date':<11} {'Dipl':>5} {'Mod':>5} {'Same':>5} {'Var':>4} {'Chg':>4} {'Drop':>5} {'Add':>4} {'Flag':>5}")
+    for date, ops in results.items():
+        if not ops:
+            continue
+        kinds = Counter(op.kind for op in ops)
+        flagged = sum(1 for s in line_scores(ops).values() if s > args.threshold)
+        dip = sum(1 for op in ops if op.dip)
+        mod = sum(1 for op in ops if op.mod)
+        print(
+            f"{date:<11} {dip:>5} {mod:>5} {kinds['=']:>5} {kinds['~']:>4} {kinds['x']:>4}"
+            f" {kinds['-']:>5} {kinds['+']:>4} {flagged:>5}"
+        )
+    return 0
@@ -0,0 +1,174 @@
+"""
+Regenerates the entry tables in TOC.md and metadata/index.md from the corpus:
+- Transcript frontmatter and Diplomatic section (status, word count)
+- metadata/date_mapping.json (the camera file each date maps to; "—" if unmapped)
+- Image inventory: images/YYYY-MM-DD.jpg and images/lines/YYYY-MM-DD/line_*.jpg
+
+Prose above and below each table is kept as-is, and hand-written cells
+(TOC "Summary", index "Notes") are carried over by date. Files are only
+rewritten when their content actually changes.
+
+Usage:
+  journal index           # rewrite TOC.md and metadata/index.md if stale
+  journal index --check   # exit 1 if either file is out of date
+"""
+from __future__ import annotations
+import argparse
+import json
+import re
+from dataclasses import dataclass
+from datetime import date as Date
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .paths import DATE_MAP_FILE, DATE_RE, IMAGES_DIR, INDEX_FILE, LINES_DIR, REPO_ROOT, TOC_FILE, TRANSCRIPTS_DIR
+from .transcript import count_words, diplomatic_body, parse_frontmatter
+
+ROW_DATE_RE = re.compile(r"\]\((?:\.\./)?transcripts/(\d{4}-\d{2}-\d{2})\.md\)")
+DRAFT_MARKERS = ("(Transcribe)", "in progress")
+
+TOC_HEADER = "| Date | Summary | Link |\n|------|----------|------|\n"
+INDEX_HEADER = (
+    "| Date | Transcription | Image | Camera file | Status | Words | Lines | Notes |\n"
+    "|------|---------------|-------|-------------|--------|-------|-------|-------|\n"
+)
+
+
+@dataclass
+class Entry:
+    date: str
+    status: str
+    words: int
+    lines: int
+    has_transcript: bool
+    has_image: bool
+    camera_file: str
+
+    @property
+    def label(self) -> str:
+        return Date.fromisoformat(self.date).strftime("%b %d, %Y")
+
+
+def entry_status(fm: Dict[str, str], body: str, words: int) -> str:
+    if not fm:
+        return "invalid"
+    if words == 0:
+        return "pending"
+    if any(marker in body for marker in DRAFT_MARKERS):
+        return "draft"
+    return "transcribed"
+
+
+def corpus_dates(date_map: Dict[str, str]) -> List[str]:
+    """All dates known to any source: transcripts, page images, or the date mapping."""
+    dates = {p.stem for p in TRANSCRIPTS_DIR.glob("*.md")}
+    dates.update(p.stem for p in IMAGES_DIR.glob("*.jpg"))
+    dates.update(date_map)
+    return sorted(d for d in dates if DATE_RE.match(d))
+
+
+def iter_entries(dates: Iterable[str], date_map: Dict[str, str]) -> Iterator[Entry]:
+    """Yields one Entry per date, reading each transcript once."""
+    for d in dates:
+        camera_file = date_map.get(d, "")
+        md = TRANSCRIPTS_DIR / f"{d}.md"
+        lines_dir = LINES_DIR / d
+        n_lines = sum(1 for _ in lines_dir.glob("line_*.jpg")) if lines_dir.is_dir() else 0
+        has_image = (IMAGES_DIR / f"{d}.jpg").exists()
+        if not md.exists():
+            yield Entry(d, "missing", 0, n_lines, False, has_image, camera_file)
+            continue
+        text = md.read_text(encoding="utf-8")
+        fm, _ = parse_frontmatter(text)
+        body = diplomatic_body(text)
+        words = count_words(body)
+        yield Entry(d, entry_status(fm, body, words), words, n_lines, True, has_image, camera_file)
+
+
+def split_table(text: str, header_prefix: str) -> Tuple[str, Dict[str, List[str]], str]:
+    """Splits a markdown file around its entry table.
+
+    Returns (prose before table, existing cells keyed by date, prose after table).
+    """
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, ln in enumerate(lines) if ln.startswith(header_prefix)), None)
+    if start is None:
+        return text.rstrip("\n") + "\n\n", {}, ""
+    end = start
+    while end < len(lines) and lines[end].lstrip().startswith("|"):
+        end += 1
+    cells: Dict[str, List[str]] = {}
+    for ln in lines[start + 2 : end]:
+        m = ROW_DATE_RE.search(ln)
+        if m:
+            cells[m.group(1)] = [c.strip() for c in ln.strip().strip("|").split("|")]
+    return "".join(lines[:start]), cells, "".join(lines[end:])
+
+
+def render_toc(entries: List[Entry], existing: Dict[str, List[str]]) -> Iterator[str]:
+    yield TOC_HEADER
+    for e in entries:
+        if not e.has_transcript:
+            continue
+        old = existing.get(e.date, [])
+        summary = old[1] if len(old) == 3 else ""
+        yield f"| {e.label} | {summary} | [link](transcripts/{e.date}.md) |\n"
+
+
+def render_index(entries: List[Entry], existing: Dict[str, List[str]]) -> Iterator[str]:
+    yield INDEX_HEADER
+    for e in entries:
+        old = existing.get(e.date, [])
+        notes = old[-1] if len(old) in (4, 7, 8) else ""
+        transcript = f"[{e.date}](transcripts/{e.date}.md)" if e.has_transcript else "—"
+        image = f"[{e.date}](images/{e.date}.jpg)" if e.has_image else "—"
+        camera = f"`{e.camera_file}`" if e.camera_file else "—"
+        yield (
+            f"| {e.label} | {transcript} | {image} | {camera} | {e.status} | {e.words} | {e.lines} | {notes} |\n"
+        )
+
+
+def rebuild(path: Path, header_prefix: str, render, entries: List[Entry]) -> str:
+    before, cells, after = split_table(path.read_text(encoding="utf-8") if path.exists() else "", header_prefix)
+    return "".join([before, *render(entries, cells), after])
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Regenerate TOC.md and metadata/index.md tables")
+    p.add_argument("--check", action="store_true", help="Report stale files and exit 1 instead of writing")
+    args = p.parse_args(argv)
+
+    date_map: Dict[str, str] = {}
+    if DATE_MAP_FILE.exists():
+        date_map = json.loads(DATE_MAP_FILE.read_text(encoding="utf-8"))
+    entries = list(iter_entries(corpus_dates(date_map), date_map))
+
+    outputs = [
+        (TOC_FILE, rebuild(TOC_FILE, "| Date |", render_toc, entries)),
+        (INDEX_FILE, rebuild(INDEX_FILE, "| Date |", render_index, entries)),
+    ]
+
+    stale = 0
+    for path, text in outputs:
+        rel = path.relative_to(REPO_ROOT)
+        if args.check:
+            if not path.exists() or path.read_text(encoding="utf-8") != text:
+                print(f"Out of date: {rel}")
+                stale += 1
+        elif write_if_changed(path, text):
+            print(f"Updated {rel}")
+            stale += 1
+    if args.check:
+        return 1 if stale else 0
+    if not stale:
+        print("No changes (already up-to-date)")
+    return 0
+
@@ -0,0 +1,174 @@
+"""
+Builds Deep Zoom (DZI) tile pyramids for manuscript pages so viewers such as
+OpenSeadragon fetch only the 256px tiles on screen instead of the full image.
+
+Source is the first of: the enhanced full page (images/processed_full/), the
+output of process_images.py (images/processed/), or the original page,
+optionally enhanced on the fly with process_images' CLAHE step (--enhance).
+
+The image is decoded once; every lower level comes from successive cv2.pyrDown
+calls on the previous level, and tiles are encoded and written in parallel.
+A page is skipped when the hash of its source (and tiling parameters) matches
+the one recorded by the previous build.
+
+Outputs:
+  images/tiles/YYYY-MM-DD.dzi
+  images/tiles/YYYY-MM-DD_files/LEVEL/COL_ROW.jpg
+
+Usage:
+  journal tiles --all
+  journal tiles 1839-04-05 --tile-size 512 --force
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import math
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from ._lazy import lazy_import
+from .paths import IMAGES_DIR, PROCESSED_DIR, PROCESSED_FULL, REPO_ROOT, TILES_DIR as OUT_DIR
+from .process_images import apply_clahe
+
+cv2 = lazy_import("cv2")
+
+# Bump when the tiling output changes so existing pyramids are rebuilt
+TILER_VERSION = "1"
+HASH_FILE = ".source_hash"
+
+DZI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="jpg" Overlap="{overlap}" TileSize="{tile_size}">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+"""
+
+
+def pick_source(date: str) -> Optional[Path]:
+    for p in (PROCESSED_FULL / f"{date}.jpg", PROCESSED_DIR / f"{date}.jpg", IMAGES_DIR / f"{date}.jpg"):
+        if p.exists():
+            return p
+    return None
+
+
+def source_hash(path: Path, args) -> str:
+    h = hashlib.sha256()
+    h.update(f"{TILER_VERSION}:{args.tile_size}:{args.overlap}:{args.quality}:{args.enhance}:{path.parent.name}/{path.name}".encode())
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_levels(img) -> List:
+    """Returns pyramid levels from 1x1 (level 0) up to the full image."""
+    levels = [img]
+    while max(levels[-1].shape[:2]) > 1:
+        prev = levels[-1]
+        h, w = prev.shape[:2]
+        levels.append(cv2.pyrDown(prev, dstsize=((w + 1) // 2, (h + 1) // 2)))
+    levels.reverse()
+    return levels
+
+
+def write_tile(path: Path, tile, quality: int) -> None:
+    ok, buf = cv2.imencode(".jpg", tile, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    if not ok:
+        raise RuntimeError(f"Failed to encode {path}")
+    path.write_bytes(buf.tobytes())
+
+
+def tile_level(pool: ThreadPoolExecutor, level_img, level_dir: Path, tile_size: int, overlap: int, quality: int) -> List:
+    level_dir.mkdir(parents=True, exist_ok=True)
+    h, w = level_img.shape[:2]
+    futures = []
+    for row in range(math.ceil(h / tile_size)):
+        y0 = max(0, row * tile_size - overlap)
+        y1 = min(h, (row + 1) * tile_size + overlap)
+        for col in range(math.ceil(w / tile_size)):
+            x0 = max(0, col * tile_size - overlap)
+            x1 = min(w, (col + 1) * tile_size + overlap)
+            tile = level_img[y0:y1, x0:x1]
+            futures.append(pool.submit(write_tile, level_dir / f"{col}_{row}.jpg", tile, quality))
+    return futures
+
+
+def process_date(date: str, outdir: Path, pool: ThreadPoolExecutor, args) -> int:
+    src = pick_source(date)
+    if src is None:
+        print(f"Image not found for {date}", file=sys.stderr)
+        return 1
+    files_dir = outdir / f"{date}_files"
+    dzi_path = outdir / f"{date}.dzi"
+    digest = source_hash(src, args)
+    hash_path = files_dir / HASH_FILE
+    if not args.force and dzi_path.exists() and hash_path.exists() and hash_path.read_text().strip() == digest:
+        print(f"{date}: up-to-date")
+        return 0
+
+    img = cv2.imread(str(src))
+    if img is None:
+        print(f"Failed to read image: {src}", file=sys.stderr)
+        return 2
+    if args.enhance and src.parent == IMAGES_DIR:
+        img = apply_clahe(img)
+    levels = build_levels(img)
+
+    # Build into a scratch directory and swap it in, so viewers never see a half-written pyramid
+    tmp_dir = outdir / f".{date}_files.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    futures = []
+    for n, level_img in enumerate(levels):
+        futures += tile_level(pool, level_img, tmp_dir / str(n), args.tile_size, args.overlap, args.quality)
+    for f in futures:
+        f.result()
+    (tmp_dir / HASH_FILE).write_text(digest + "\n")
+
+    if files_dir.exists():
+        shutil.rmtree(files_dir)
+    os.replace(tmp_dir, files_dir)
+    h, w = img.shape[:2]
+    dzi_path.write_text(
+        DZI_TEMPLATE.format(overlap=args.overlap, tile_size=args.tile_size, width=w, height=h), encoding="utf-8"
+    )
+    print(f"{date}: {len(levels)} levels, {len(futures)} tiles from {src.relative_to(REPO_ROOT)}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Build Deep Zoom tile pyramids for manuscript pages")
+    p.add_argument("dates", nargs="*", help="Specific YYYY-MM-DD dates to tile")
+    p.add_argument("--all", action="store_true", help="Tile every page in images/")
+    p.add_argument("--outdir", default=str(OUT_DIR), help="Output directory")
+    p.add_argument("--tile-size", type=int, default=256, help="Tile edge in pixels (default 256)")
+    p.add_argument("--overlap", type=int, default=1, help="Tile overlap in pixels (default 1)")
+    p.add_argument("--quality", type=int, default=85, help="JPEG quality (default 85)")
+    p.add_argument("--enhance", action="store_true", help="Apply CLAHE to originals lacking a processed image")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel tile writers")
+    p.add_argument("--force", action="store_true", help="Rebuild even if the source hash is unchanged")
+    args = p.parse_args(argv)
+    outdir = Path(args.outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    if args.all:
+        targets = [img.stem for img in sorted(IMAGES_DIR.glob("*.jpg"))]
+    else:
+        targets = list(args.dates)
+    if not targets:
+        print("No targets provided. Pass dates or --all.")
+        return 1
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for d in targets:
+            if process_date(d, outdir, pool, args) != 0:
+                failures += 1
+    if failures:
+        print(f"Completed with {failures} failures.")
+        return 2
+    return 0
+
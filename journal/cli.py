@@ -0,0 +1,73 @@
+"""
+`journal` command: one entry point for all edition tools.
+
+Subcommand modules are imported only when that subcommand runs, and image
+modules defer OpenCV/NumPy until first use, so `journal --help` and the
+text-only commands start without loading them.
+
+Usage:
+  journal COMMAND [options]
+  journal COMMAND --help
+"""
+from __future__ import annotations
+import importlib
+import sys
+from typing import List, Optional
+
+from . import __version__
+from ._lazy import MissingDependency
+
+# name -> (module, one-line description); module is imported on demand
+COMMANDS = {
+    "process": ("process_images", "Crop, deskew and enhance page images into images/processed/"),
+    "segment": ("ocr_assist", "Segment pages into line crops under images/lines/DATE/ (optional OCR)"),
+    "scaffold": ("scaffold_from_lines", "Insert line-crop scaffold into a transcript's Diplomatic section"),
+    "refs": ("refs", "Add image_processed_ref / image_working_ref to transcript frontmatter"),
+    "normalize": ("normalize_frontmatter", "Repair transcript frontmatter delimiters"),
+    "validate": ("validate_repository", "Check transcripts, images, TOC and metadata for consistency"),
+    "index": ("build_indexes", "Regenerate TOC.md and metadata/index.md tables"),
+    "compile": ("compile_edition", "Build the HTML edition in compiled/site/"),
+    "tiles": ("build_tiles", "Build Deep Zoom tile pyramids under images/tiles/"),
+    "serve": ("image_server", "Serve pages, line crops and tiles locally with caching"),
+    "phash": ("phash_index", "Verify page images and date_mapping.json with perceptual hashes"),
+    "stats": ("stats", "Word counts, term frequencies and keyword-in-context search"),
+    "align": ("align", "Align Diplomatic and Modernized text; spelling variants and disagreements"),
+    "dataset": ("dataset", "Export line crops and transcriptions as sharded tar files for HTR training"),
+}
+
+
+def usage() -> str:
+    width = max(len(name) for name in COMMANDS)
+    lines = [
+        "usage: journal COMMAND [options]",
+        "",
+        "Tools for the Hyrum Smith Liberty Jail Journal digital edition.",
+        "",
+        "commands:",
+    ]
+    lines += [f"  {name.ljust(width)}  {desc}" for name, (_, desc) in COMMANDS.items()]
+    lines += ["", "Run 'journal COMMAND --help' for command options."]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 1
+    if argv[0] == "--version":
+        print(f"journal {__version__}")
+        return 0
+
+    name, rest = argv[0], argv[1:]
+    if name not in COMMANDS:
+        print(f"journal: unknown command '{name}'\n\n{usage()}", file=sys.stderr)
+        return 2
+    module = importlib.import_module(f".{COMMANDS[name][0]}", __package__)
+    # argparse derives its usage line from argv[0]
+    sys.argv[0] = f"journal {name}"
+    try:
+        return module.main(rest) or 0
+    except MissingDependency as e:
+        print(str(e), file=sys.stderr)
+        return 1
@@ -0,0 +1,353 @@
+"""
+Compiles the published edition from the markdown sources:
+- Preface.md and docs/*.md as front matter
+- transcripts/YYYY-MM-DD.md as daily entries (frontmatter and scaffold apparatus removed)
+- Manuscript images (processed_full if present, else originals), downscaled for the web
+
+Each entry is rendered to an HTML fragment in parallel and cached under
+.cache/edition/ by a hash of its inputs; downscaled images are cached the same
+way. Pages are then assembled from cached fragments, so after editing one entry
+only that entry is re-rendered. Output files are only rewritten when changed.
+
+Outputs (compiled/site/):
+  index.html            Table of contents and front matter
+  entries/DATE.html     One page per entry
+  edition.html          Single printable document (print to PDF from a browser)
+
+Usage:
+  journal compile
+  journal compile --jobs 4 --image-width 1200
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import html
+import os
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date as Date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ._lazy import lazy_import
+from .build_indexes import write_if_changed
+from .paths import CACHE_DIR, COMPILED_DIR, DATE_RE, DOCS_DIR, IMAGES_DIR, PREFACE_FILE, PROCESSED_FULL, TRANSCRIPTS_DIR
+from .transcript import diplomatic_body, modernized_body, parse_frontmatter, published_text
+
+cv2 = lazy_import("cv2")
+
+OUT_DIR = COMPILED_DIR / "site"
+EDITION_CACHE = CACHE_DIR / "edition"
+
+# Bump when rendering changes so cached fragments are invalidated
+RENDER_VERSION = "2"
+FRONT_MATTER_DOCS = [
+    "editors-preface.md",
+    "historical-introduction.md",
+    "transcription-method.md",
+    "references.md",
+    "about-editor.md",
+]
+CSS = """\
+body { font-family: Georgia, 'Times New Roman', serif; max-width: 46em; margin: 2em auto; padding: 0 1em; line-height: 1.5; color: #222; }
+h1, h2, h3 { font-weight: normal; }
+figure { margin: 1.5em 0; text-align: center; }
+figure img { max-width: 100%; height: auto; border: 1px solid #ccc; }
+.diplomatic p { font-family: 'Courier New', monospace; font-size: 0.95em; }
+blockquote { margin: 1em 2em; font-style: italic; }
+.diplomatic blockquote { margin: 0; font-style: normal; }
+nav.toc ol { columns: 2; }
+footer { margin-top: 3em; font-size: 0.85em; color: #666; }
+@media print {
+  body { max-width: none; margin: 0; }
+  .entry, .doc { page-break-before: always; }
+  nav { display: none; }
+}
+"""
+
+
+@dataclass
+class Entry:
+    date: str
+    source: Path
+    image: Optional[Path]
+
+    @property
+    def label(self) -> str:
+        return Date.fromisoformat(self.date).strftime("%B %d, %Y")
+
+
+# --- Markdown (the subset used by this repository) ---------------------------
+
+INLINE_RULES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"!\[([^\]]*)\]\(([^)]+)\)"), r'<img alt="\1" src="\2">'),
+    (re.compile(r"\[([^\]]+)\]\(([^)]+)\)"), r'<a href="\2">\1</a>'),
+    (re.compile(r"`([^`]+)`"), r"<code>\1</code>"),
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])"), r"<em>\1</em>"),
+    (re.compile(r"(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)"), r"<em>\1</em>"),
+]
+
+
+def render_inline(text: str) -> str:
+    out = html.escape(text, quote=False)
+    for pattern, repl in INLINE_RULES:
+        out = pattern.sub(repl, out)
+    return out
+
+
+def render_markdown(text: str, hard_breaks: bool = False) -> str:
+    """Renders headings, rules, lists, blockquotes and paragraphs.
+
+    With hard_breaks, every source line break is kept (diplomatic text);
+    otherwise only lines ending in two spaces break.
+    """
+    parts: List[str] = []
+    para: List[str] = []
+    items: List[str] = []
+    quote: List[str] = []
+    list_tag = ""
+
+    def flush() -> None:
+        nonlocal list_tag
+        if quote:
+            inner = render_markdown("\n".join(quote), hard_breaks)
+            parts.append(f"<blockquote>\n{inner}\n</blockquote>")
+            quote.clear()
+        if para:
+            if hard_breaks:
+                body = "<br>\n".join(render_inline(ln.strip()) for ln in para)
+            else:
+                body = "".join(
+                    render_inline(ln.rstrip()) + ("<br>\n" if ln.endswith("  ") else "\n") for ln in para
+                ).rstrip("\n")
+            parts.append(f"<p>{body}</p>")
+            para.clear()
+        if items:
+            parts.append(f"<{list_tag}>" + "".join(f"<li>{i}</li>" for i in items) + f"</{list_tag}>")
+            items.clear()
+            list_tag = ""
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = re.match(r"^(#{1,6})\s+(.*)$", stripped)
+        bullet = re.match(r"^[-*]\s+(.*)$", stripped)
+        numbered = re.match(r"^\d+\.\s+(.*)$", stripped)
+        if quote and not stripped.startswith(">"):
+            flush()
+        if stripped.startswith(">"):
+            if para or items:
+                flush()
+            quote.append(re.sub(r"^\s*>\s?", "", line))
+        elif not stripped:
+            flush()
+        elif heading:
+            flush()
+            level = len(heading.group(1))
+            parts.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+        elif re.match(r"^(-{3,}|\*{3,})$", stripped):
+            flush()
+            parts.append("<hr>")
+        elif bullet or numbered:
+            tag = "ul" if bullet else "ol"
+            if para or (items and list_tag != tag):
+                flush()
+            list_tag = tag
+            items.append(render_inline((bullet or numbered).group(1)))
+        else:
+            if items:
+                flush()
+            para.append(line)
+    flush()
+    return "\n".join(parts)
+
+
+# --- Entry fragments ---------------------------------------------------------
+
+def split_entry(text: str) -> Tuple[Dict[str, str], str, str]:
+    """Returns (frontmatter, diplomatic body, modernized body) with apparatus removed."""
+    fm, _ = parse_frontmatter(text)
+    return fm, published_text(diplomatic_body(text)), published_text(modernized_body(text))
+
+
+def render_entry(date: str, text: str, image_href: Optional[str]) -> str:
+    fm, diplomatic, modernized = split_entry(text)
+    title = fm.get("title") or f"Hyrum Smith Journal – {date}"
+    out = [f'<article class="entry" id="{date}">', f"<h2>{html.escape(title)}</h2>"]
+    if fm.get("location"):
+        out.append(f'<p class="location"><em>{html.escape(fm["location"])}</em></p>')
+    if image_href:
+        out.append(
+            f'<figure><img loading="lazy" alt="Manuscript page, {date}" src="{image_href}">'
+            f"<figcaption>Manuscript page, {date}</figcaption></figure>"
+        )
+    out.append('<section class="diplomatic"><h3>Faithful (Diplomatic) Transcription</h3>')
+    out.append(render_markdown(diplomatic, hard_breaks=True))
+    out.append('</section>\n<section class="modernized"><h3>Modernized (Readable) Transcription</h3>')
+    out.append(render_markdown(modernized))
+    out.append("</section>\n</article>")
+    return "\n".join(out)
+
+
+def fragment_key(entry: Entry, text: str) -> str:
+    h = hashlib.sha256()
+    h.update(RENDER_VERSION.encode())
+    h.update(entry.date.encode())
+    h.update(text.encode("utf-8"))
+    h.update(b"img" if entry.image else b"")
+    return h.hexdigest()
+
+
+def build_fragment(date: str, text: str, image_href: Optional[str], out_path: str) -> str:
+    """Worker: renders one entry and stores it in the fragment cache."""
+    frag = render_entry(date, text, image_href)
+    tmp = Path(out_path + ".tmp")
+    tmp.write_text(frag, encoding="utf-8")
+    os.replace(tmp, out_path)
+    return date
+
+
+# --- Images ------------------------------------------------------------------
+
+def image_key(src: Path, width: int) -> str:
+    st = src.stat()
+    return hashlib.sha256(f"{src.name}:{st.st_size}:{st.st_mtime_ns}:{width}".encode()).hexdigest()[:24]
+
+
+def downscale_image(src: str, dst: str, width: int) -> str:
+    """Worker: writes a downscaled JPEG copy of src (never upscales)."""
+    img = cv2.imread(src)
+    if img is None:
+        raise RuntimeError(f"Failed to read {src}")
+    h, w = img.shape[:2]
+    if w > width:
+        img = cv2.resize(img, (width, int(h * width / float(w))), interpolation=cv2.INTER_AREA)
+    tmp = dst + ".tmp.jpg"
+    cv2.imwrite(tmp, img, [int(cv2.IMWRITE_JPEG_QUALITY), 85])
+    os.replace(tmp, dst)
+    return dst
+
+
+def pick_image(date: str) -> Optional[Path]:
+    for p in (PROCESSED_FULL / f"{date}.jpg", IMAGES_DIR / f"{date}.jpg"):
+        if p.exists():
+            return p
+    return None
+
+
+def publish_file(src: Path, dst: Path) -> bool:
+    """Hard-links (or copies) a cached file into the output tree if it differs."""
+    if dst.exists():
+        s, d = src.stat(), dst.stat()
+        if (s.st_ino, s.st_dev) == (d.st_ino, d.st_dev) or (s.st_size, s.st_mtime_ns) == (d.st_size, d.st_mtime_ns):
+            return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists():
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return True
+
+
+# --- Assembly ----------------------------------------------------------------
+
+def page(title: str, body: str, css_href: str) -> str:
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        f"<title>{html.escape(title)}</title>\n<link rel=\"stylesheet\" href=\"{css_href}\">\n"
+        f"</head>\n<body>\n{body}\n<footer>Edited and prepared by Mark Phillips, 2025 Digital Edition.</footer>\n"
+        "</body>\n</html>\n"
+    )
+
+
+def front_matter_html() -> List[str]:
+    docs = [PREFACE_FILE] + [DOCS_DIR / name for name in FRONT_MATTER_DOCS]
+    return [f'<section class="doc">\n{render_markdown(p.read_text(encoding="utf-8"))}\n</section>' for p in docs if p.exists()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Compile the edition to HTML")
+    p.add_argument("--outdir", default=str(OUT_DIR), help="Output directory")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Parallel render workers")
+    p.add_argument("--image-width", type=int, default=1400, help="Max width of embedded page images (default 1400)")
+    p.add_argument("--no-images", action="store_true", help="Do not embed manuscript images")
+    args = p.parse_args(argv)
+
+    outdir = Path(args.outdir)
+    frag_dir = EDITION_CACHE / "fragments"
+    img_cache = EDITION_CACHE / "images"
+    frag_dir.mkdir(parents=True, exist_ok=True)
+    img_cache.mkdir(parents=True, exist_ok=True)
+
+    # Contents, edition and Previous/Next links always cover every transcript;
+    # the fragment cache keeps unchanged entries from being re-rendered
+    entries = [
+        Entry(s.stem, s, None if args.no_images else pick_image(s.stem))
+        for s in sorted(TRANSCRIPTS_DIR.glob("*.md"))
+        if DATE_RE.match(s.stem)
+    ]
+    if not entries:
+        print("No transcripts found.")
+        return 1
+
+    # Plan work: anything whose cache key is missing gets (re)built
+    fragments: Dict[str, Path] = {}
+    images: Dict[str, Path] = {}
+    frag_jobs = []
+    img_jobs = []
+    for e in entries:
+        text = e.source.read_text(encoding="utf-8")
+        frag_path = frag_dir / f"{fragment_key(e, text)}.html"
+        fragments[e.date] = frag_path
+        href = f"images/{e.date}.jpg" if e.image else None
+        if not frag_path.exists():
+            frag_jobs.append((e.date, text, href, str(frag_path)))
+        if e.image:
+            img_path = img_cache / f"{image_key(e.image, args.image_width)}.jpg"
+            images[e.date] = img_path
+            if not img_path.exists():
+                img_jobs.append((str(e.image), str(img_path), args.image_width))
+
+    if frag_jobs or img_jobs:
+        with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+            futures = [pool.submit(build_fragment, *job) for job in frag_jobs]
+            futures += [pool.submit(downscale_image, *job) for job in img_jobs]
+            for f in futures:
+                f.result()
+
+    changed = 0
+    bodies = {d: path.read_text(encoding="utf-8") for d, path in fragments.items()}
+    for date, src in images.items():
+        changed += publish_file(src, outdir / "images" / f"{date}.jpg")
+    changed += write_if_changed(outdir / "style.css", CSS)
+
+    # Entry pages reference images one directory up
+    for i, e in enumerate(entries):
+        nav = ['<nav><a href="../index.html">Contents</a>']
+        if i > 0:
+            nav.append(f' · <a href="{entries[i - 1].date}.html">Previous</a>')
+        if i + 1 < len(entries):
+            nav.append(f' · <a href="{entries[i + 1].date}.html">Next</a>')
+        nav.append("</nav>")
+        body = "".join(nav) + "\n" + bodies[e.date].replace('src="images/', 'src="../images/')
+        changed += write_if_changed(outdir / "entries" / f"{e.date}.html", page(e.label, body, "../style.css"))
+
+    front = front_matter_html()
+    toc = ['<nav class="toc"><h2>Entries</h2><ol>']
+    toc += [f'<li><a href="entries/{e.date}.html">{e.label}</a></li>' for e in entries]
+    toc.append('</ol><p><a href="edition.html">Printable edition</a></p></nav>')
+    title = "Hyrum Smith — Liberty Jail Journal"
+    changed += write_if_changed(outdir / "index.html", page(title, "\n".join([f"<h1>{title}</h1>", *toc, *front]), "style.css"))
+    edition = [f"<h1>{title}</h1>", *front, *(bodies[e.date] for e in entries)]
+    changed += write_if_changed(outdir / "edition.html", page(title, "\n".join(edition), "style.css"))
+
+    print(
+        f"Rendered {len(frag_jobs)}/{len(entries)} entries, resized {len(img_jobs)} images, "
+        f"updated {changed} output file(s) in {outdir}"
+    )
+    return 0
+
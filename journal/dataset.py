@@ -0,0 +1,288 @@
+"""
+Exports line crops paired with their Diplomatic text as a sharded dataset for
+handwriting recognition, and reads it back.
+
+Records come from the scaffold blocks in the transcripts: each crop in
+images/lines/DATE/ with the `> ` text typed under its `[Line NNN]` label (see
+scaffold_from_lines.scaffold_lines) and, when `journal segment` recorded it,
+the crop's box on the page from _boxes.json.
+
+Records are packed in order into uncompressed tar shards of about --shard-size MB
+(KEY.jpg and KEY.json per record, the WebDataset layout), and index.json gives
+every record's shard, byte offsets and sizes. A reader opens each shard once
+and reads it front to back, or seeks straight to any one record; it never opens
+a file per line.
+
+Output (compiled/dataset/):
+  shard-00000.tar ...
+  index.json
+
+Usage:
+  journal dataset                         # export transcribed lines
+  journal dataset --all-lines             # also untranscribed crops (text "")
+  journal dataset --sample 5 --shuffle    # read records back
+  journal dataset --verify
+"""
+from __future__ import annotations
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tarfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from ._lazy import lazy_import
+from .ocr_assist import BOXES_FILE
+from .paths import COMPILED_DIR, DATE_RE, LINES_DIR, TRANSCRIPTS_DIR
+from .scaffold_from_lines import scaffold_lines
+from .transcript import diplomatic_body
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+OUT_DIR = COMPILED_DIR / "dataset"
+INDEX_FILE = "index.json"
+# Bump when the shard or index layout changes
+FORMAT_VERSION = 1
+# Columns of each row in index.json "records"
+INDEX_FIELDS = ["shard", "key", "image_offset", "image_size", "meta_offset", "meta_size"]
+
+
+@dataclass
+class Record:
+    key: str
+    date: str
+    line: str
+    text: str
+    box: Optional[List[int]]  # [x, y, w, h] on the source page, if known
+    source: Optional[str]  # page image the crop was cut from, if known
+    image: bytes  # JPEG bytes as stored in images/lines/
+
+    def decode(self):
+        """The crop as a BGR array (needs OpenCV)."""
+        return cv2.imdecode(np.frombuffer(self.image, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def load_boxes(line_dir: Path) -> Tuple[Optional[str], Dict[str, List[int]]]:
+    try:
+        data = json.loads((line_dir / BOXES_FILE).read_text(encoding="utf-8"))
+        return data.get("source"), data.get("boxes", {})
+    except (OSError, ValueError):
+        return None, {}
+
+
+def iter_line_sources(all_lines: bool = False) -> Iterator[Tuple[Path, dict]]:
+    """Yields (crop path, metadata) in date and line order, one transcript at a time."""
+    for md in sorted(TRANSCRIPTS_DIR.glob("*.md")):
+        date = md.stem
+        if not DATE_RE.match(date):
+            continue
+        texts = scaffold_lines(diplomatic_body(md.read_text(encoding="utf-8")))
+        line_dir = LINES_DIR / date
+        names = sorted(p.name for p in line_dir.glob("line_*.jpg")) if all_lines else sorted(texts)
+        source, boxes = load_boxes(line_dir)
+        for name in names:
+            text = texts.get(name, "")
+            path = line_dir / name
+            if not (text or all_lines) or not path.exists():
+                continue
+            stem = path.stem
+            yield path, {
+                "key": f"{date}_{stem}",
+                "date": date,
+                "line": stem,
+                "text": text,
+                "box": boxes.get(name),
+                "source": source,
+            }
+
+
+def _padded(size: int) -> int:
+    return -(-size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+
+
+class ShardWriter:
+    """Appends records to size-bounded tar shards and records where each member's data starts."""
+
+    def __init__(self, out_dir: Path, max_bytes: int):
+        self.out_dir = out_dir
+        self.max_bytes = max_bytes
+        self.shards: List[str] = []
+        self.records: List[list] = []
+        self.tar: Optional[tarfile.TarFile] = None
+
+    def _add_member(self, name: str, data: bytes) -> Tuple[int, int]:
+        info = tarfile.TarInfo(name)
+        info.size, info.mtime, info.mode = len(data), 0, 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+        # tar.offset now points past this member's zero-padded data
+        return self.tar.offset - _padded(len(data)), len(data)
+
+    def add(self, key: str, image: bytes, meta: dict) -> None:
+        if self.tar is None or self.tar.offset >= self.max_bytes:
+            self.close()
+            self.shards.append(f"shard-{len(self.shards):05d}.tar")
+            self.tar = tarfile.open(self.out_dir / self.shards[-1], "w", format=tarfile.USTAR_FORMAT)
+        meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        image_at = self._add_member(f"{key}.jpg", image)
+        meta_at = self._add_member(f"{key}.json", meta_bytes)
+        self.records.append([len(self.shards) - 1, key, *image_at, *meta_at])
+
+    def close(self) -> None:
+        if self.tar is not None:
+            self.tar.close()
+            self.tar = None
+
+    def write_index(self) -> None:
+        index = {"version": FORMAT_VERSION, "shards": self.shards, "fields": INDEX_FIELDS, "records": self.records}
+        (self.out_dir / INDEX_FILE).write_text(json.dumps(index, separators=(",", ":")) + "\n", encoding="utf-8")
+
+
+def export(out_dir: Path, shard_mb: float, all_lines: bool) -> Tuple[int, int]:
+    """Writes a fresh dataset to out_dir (built alongside, then swapped in). Returns (records, shards)."""
+    tmp_dir = out_dir.with_name(f".{out_dir.name}.tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    writer = ShardWriter(tmp_dir, int(shard_mb * 1024 * 1024))
+    try:
+        for path, meta in iter_line_sources(all_lines):
+            writer.add(meta["key"], path.read_bytes(), meta)
+    finally:
+        writer.close()
+    writer.write_index()
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return len(writer.records), len(writer.shards)
+
+
+class LineDataset:
+    """Reader for an exported dataset: len(), ds[i] random access, and sequential or shuffled streaming."""
+
+    def __init__(self, root: Path = OUT_DIR, max_open: int = 8):
+        index = json.loads((root / INDEX_FILE).read_text(encoding="utf-8"))
+        if index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{root / INDEX_FILE}: unsupported dataset version {index.get('version')}")
+        self.root = root
+        self.shards: List[str] = index["shards"]
+        self.records: List[list] = index["records"]
+        self.max_open = max_open
+        self._handles: "OrderedDict[int, BinaryIO]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, i: int) -> Record:
+        row = self.records[i]
+        return self._read(row, self._handle(row[0]))
+
+    def __iter__(self) -> Iterator[Record]:
+        return self.stream()
+
+    def __enter__(self) -> "LineDataset":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _handle(self, shard: int) -> BinaryIO:
+        f = self._handles.get(shard)
+        if f is None:
+            if len(self._handles) >= self.max_open:
+                self._handles.popitem(last=False)[1].close()
+            f = self._handles[shard] = open(self.root / self.shards[shard], "rb")
+        else:
+            self._handles.move_to_end(shard)
+        return f
+
+    @staticmethod
+    def _read(row: list, f: BinaryIO) -> Record:
+        _, key, image_offset, image_size, meta_offset, meta_size = row
+        f.seek(image_offset)
+        image = f.read(image_size)
+        f.seek(meta_offset)
+        meta = json.loads(f.read(meta_size).decode("utf-8"))
+        return Record(key, meta["date"], meta["line"], meta["text"], meta.get("box"), meta.get("source"), image)
+
+    def stream(self, shuffle: bool = False, seed: Optional[int] = None, buffer: int = 512) -> Iterator[Record]:
+        """Yields every record, reading each shard once from front to back.
+
+        With shuffle, shards are visited in random order and records pass
+        through a shuffle buffer of `buffer` records, so reads stay sequential.
+        """
+        rng = random.Random(seed)
+        rows: Dict[int, List[list]] = {}
+        for row in self.records:
+            rows.setdefault(row[0], []).append(row)
+        order = sorted(rows)
+        if shuffle:
+            rng.shuffle(order)
+        pool: List[Record] = []
+        for shard in order:
+            with open(self.root / self.shards[shard], "rb", buffering=1 << 20) as f:
+                for row in sorted(rows[shard], key=lambda r: r[2]):
+                    record = self._read(row, f)
+                    if not shuffle:
+                        yield record
+                        continue
+                    pool.append(record)
+                    if len(pool) >= buffer:
+                        i = rng.randrange(len(pool))
+                        pool[i], pool[-1] = pool[-1], pool[i]
+                        yield pool.pop()
+        rng.shuffle(pool)
+        yield from pool
+
+    def close(self) -> None:
+        while self._handles:
+            self._handles.popitem()[1].close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Export line crops and their transcriptions as a sharded dataset")
+    p.add_argument("--out", type=Path, default=OUT_DIR, help="Dataset directory (default compiled/dataset)")
+    p.add_argument("--shard-size", type=float, default=64, help="Approximate shard size in MB (default 64)")
+    p.add_argument("--all-lines", action="store_true", help="Include crops without a transcription (text \"\")")
+    p.add_argument("--sample", type=int, metavar="N", help="Print N records from an existing export instead of exporting")
+    p.add_argument("--shuffle", action="store_true", help="With --sample, stream in shuffled order")
+    p.add_argument("--seed", type=int, help="Shuffle seed")
+    p.add_argument("--verify", action="store_true", help="Stream an existing export and check every record")
+    args = p.parse_args(argv)
+
+    if args.sample is None and not args.verify:
+        start = time.perf_counter()
+        n, shards = export(args.out, args.shard_size, args.all_lines)
+        print(f"Wrote {n} record(s) in {shards} shard(s) to {args.out} ({time.perf_counter() - start:.1f}s)")
+        return 0
+
+    if not (args.out / INDEX_FILE).exists():
+        print(f"No dataset at {args.out}; run 'journal dataset' first", file=sys.stderr)
+        return 1
+    with LineDataset(args.out) as ds:
+        if args.verify:
+            start = time.perf_counter()
+            bad = count = size = 0
+            for record in ds.stream():
+                count += 1
+                size += len(record.image)
+                if not record.image.startswith(b"\xff\xd8"):
+                    print(f"{record.key}: image is not a JPEG")
+                    bad += 1
+            elapsed = time.perf_counter() - start
+            print(f"{count}/{len(ds)} record(s), {size / 1e6:.1f} MB read in {elapsed:.2f}s; {bad} bad")
+            return 1 if bad or count != len(ds) else 0
+
+        for i, record in enumerate(ds.stream(shuffle=args.shuffle, seed=args.seed)):
+            if i >= args.sample:
+                break
+            box = "x".join(map(str, record.box)) if record.box else "-"
+            print(f"{record.key:<24} {len(record.image):>7}B  box={box:<18} {record.text or '(untranscribed)'}")
+    return 0
@@ -0,0 +1,378 @@
+"""
+Local caching image server for editors (offline, stdlib asyncio + OpenCV).
+
+Routes (all GET/HEAD):
+  /pages/DATE.jpg[?variant=original|processed_full|processed_safe][&w=WIDTH]
+  /lines/DATE/line_NNN.jpg[?w=WIDTH]       existing crops from ocr_assist.py (also _contact_sheet.jpg, _preview.jpg)
+  /crops/DATE/NNN.jpg[?source=...][&w=WIDTH] line crop cut on demand from segment_lines boxes
+  /tiles/...                               Deep Zoom pyramids from build_tiles.py
+
+Encoded responses and decoded pages are kept in in-memory LRU caches bounded by
+size. Every response carries an ETag derived from the source file's size and
+mtime plus the request parameters, so If-None-Match revalidation answers 304
+without touching the image. Single byte ranges are supported. Decoding,
+resizing and encoding run in a thread pool; identical concurrent requests share
+one computation.
+
+Usage:
+  journal serve                   # http://127.0.0.1:8765/
+  journal serve --port 9000 --cache-mb 512
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import hashlib
+import re
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ._lazy import lazy_import
+from .ocr_assist import pick_source, segment_lines
+from .paths import DATE_RE, IMAGES_DIR, LINES_DIR, PROCESSED_FULL, PROCESSED_SAFE, TILES_DIR
+
+cv2 = lazy_import("cv2")
+
+LINE_FILE_RE = re.compile(r"^[\w.-]+\.jpg$")
+VARIANT_DIRS = {"original": IMAGES_DIR, "processed_full": PROCESSED_FULL, "processed_safe": PROCESSED_SAFE}
+MAX_WIDTH = 8192
+MAX_HEADER_BYTES = 16384
+# Line boxes are tiny; this holds a few hundred pages' worth
+BOXES_CACHE_BYTES = 1 << 20
+BOX_BYTES = 64  # rough footprint of one (x, y, w, h) tuple
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class LRUCache:
+    """Byte-bounded LRU; values are (payload, size_in_bytes)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._items: "OrderedDict[tuple, Tuple[object, int]]" = OrderedDict()
+        # Shared between the event loop and worker threads
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key: tuple, value, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._items[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.bytes -= evicted
+
+
+class ImageStore:
+    def __init__(self, cache_bytes: int, workers: int):
+        # Encoded responses get most of the budget; decoded pages are large but few
+        self.encoded = LRUCache(cache_bytes * 3 // 4)
+        self.decoded = LRUCache(cache_bytes // 4)
+        self.boxes = LRUCache(BOXES_CACHE_BYTES)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.inflight: Dict[tuple, asyncio.Future] = {}
+
+    async def fetch(self, key: tuple, produce: Callable[[], bytes]) -> bytes:
+        """Returns cached bytes for key, computing them once even under concurrent requests."""
+        hit = self.encoded.get(key)
+        if hit is not None:
+            return hit
+        fut = self.inflight.get(key)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = loop.run_in_executor(self.pool, produce)
+            self.inflight[key] = fut
+            try:
+                data = await fut
+            finally:
+                self.inflight.pop(key, None)
+            self.encoded.put(key, data, len(data))
+            return data
+        return await asyncio.shield(fut)
+
+    def decode(self, path: Path, stamp: tuple):
+        key = ("decoded", str(path), stamp)
+        img = self.decoded.get(key)
+        if img is None:
+            img = cv2.imread(str(path))
+            if img is None:
+                raise HTTPError(500, f"Failed to read {path.name}")
+            self.decoded.put(key, img, img.nbytes)
+        return img
+
+    def line_boxes(self, date: str, path: Path, stamp: tuple) -> List:
+        key = (date, str(path), stamp)
+        boxes = self.boxes.get(key)
+        if boxes is None:
+            boxes, _ = segment_lines(self.decode(path, stamp))
+            self.boxes.put(key, boxes, BOX_BYTES * (len(boxes) + 1))
+        return boxes
+
+
+def stat_stamp(path: Path) -> tuple:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        raise HTTPError(404, "Not found")
+    return (st.st_size, st.st_mtime_ns)
+
+
+def make_etag(path: Path, stamp: tuple, params: tuple) -> str:
+    digest = hashlib.sha1(repr((str(path), stamp, params)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def parse_width(query: Dict[str, List[str]]) -> int:
+    raw = query.get("w", ["0"])[0]
+    if not raw.isdigit() or int(raw) > MAX_WIDTH:
+        raise HTTPError(400, "w must be an integer between 0 and 8192")
+    return int(raw)
+
+
+def resize_to(img, width: int):
+    h, w = img.shape[:2]
+    if not width or width >= w:
+        return img
+    return cv2.resize(img, (width, max(1, int(h * width / float(w)))), interpolation=cv2.INTER_AREA)
+
+
+def encode_jpeg(img, quality: int = 90) -> bytes:
+    ok, buf = cv2.imencode(".jpg", img, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+    if not ok:
+        raise HTTPError(500, "Failed to encode image")
+    return buf.tobytes()
+
+
+def enhance_crop(crop):
+    # Same treatment ocr_assist.py applies to saved line crops
+    gray = cv2.equalizeHist(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY))
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+class Response:
+    def __init__(self, status: int, body: bytes = b"", content_type: str = "text/plain; charset=utf-8"):
+        self.status = status
+        self.body = body
+        self.headers: Dict[str, str] = {"Content-Type": content_type}
+
+
+Resolved = Tuple[Path, tuple, tuple, Optional[Callable[[], bytes]]]
+
+
+class ImageServer:
+    def __init__(self, store: ImageStore):
+        self.store = store
+
+    # --- route resolution: (source path, stamp, params, producer or None for raw file)
+
+    def resolve(self, parts: List[str], query: Dict[str, List[str]]) -> Resolved:
+        if len(parts) == 2 and parts[0] == "pages":
+            return self.resolve_page(parts[1], query)
+        if len(parts) == 3 and parts[0] == "lines":
+            return self.resolve_line_file(parts[1], parts[2], query)
+        if len(parts) == 3 and parts[0] == "crops":
+            return self.resolve_crop(parts[1], parts[2], query)
+        if len(parts) >= 2 and parts[0] == "tiles":
+            path = (TILES_DIR / "/".join(parts[1:])).resolve()
+            if TILES_DIR.resolve() not in path.parents or not path.is_file():
+                raise HTTPError(404, "Not found")
+            return path, stat_stamp(path), (), None
+        raise HTTPError(404, "Not found")
+
+    def resolve_page(self, name: str, query: Dict[str, List[str]]) -> Resolved:
+        date = name[:-4] if name.endswith(".jpg") else name
+        variant = query.get("variant", ["original"])[0]
+        if not DATE_RE.match(date) or variant not in VARIANT_DIRS:
+            raise HTTPError(404, "Not found")
+        path = VARIANT_DIRS[variant] / f"{date}.jpg"
+        stamp = stat_stamp(path)
+        width = parse_width(query)
+        if not width:
+            return path, stamp, (), None
+        return path, stamp, ("w", width), lambda: encode_jpeg(resize_to(self.store.decode(path, stamp), width))
+
+    def resolve_line_file(self, date: str, name: str, query: Dict[str, List[str]]) -> Resolved:
+        if not DATE_RE.match(date) or not LINE_FILE_RE.match(name):
+            raise HTTPError(404, "Not found")
+        path = LINES_DIR / date / name
+        stamp = stat_stamp(path)
+        width = parse_width(query)
+        if not width:
+            return path, stamp, (), None
+        return path, stamp, ("w", width), lambda: encode_jpeg(resize_to(self.store.decode(path, stamp), width))
+
+    def resolve_crop(self, date: str, name: str, query: Dict[str, List[str]]) -> Resolved:
+        index = name[:-4] if name.endswith(".jpg") else name
+        source = query.get("source", ["processed_full"])[0]
+        if not DATE_RE.match(date) or not index.isdigit() or source not in VARIANT_DIRS:
+            raise HTTPError(404, "Not found")
+        path = pick_source(date, source)
+        stamp = stat_stamp(path)
+        width = parse_width(query)
+        n = int(index)
+
+        def produce() -> bytes:
+            boxes = self.store.line_boxes(date, path, stamp)
+            if not 1 <= n <= len(boxes):
+                raise HTTPError(404, f"{date} has {len(boxes)} detected lines")
+            x, y, w, h = boxes[n - 1]
+            crop = enhance_crop(self.store.decode(path, stamp)[y : y + h, x : x + w])
+            return encode_jpeg(resize_to(crop, width), 95)
+
+        return path, stamp, ("crop", n, width), produce
+
+    # --- HTTP
+
+    async def respond(self, method: str, target: str, headers: Dict[str, str]) -> Response:
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(405, "Method not allowed")
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        if any(p in ("", ".", "..") for p in parts):
+            raise HTTPError(404, "Not found")
+        path, stamp, params, produce = self.resolve(parts, parse_qs(url.query))
+
+        etag = make_etag(path, stamp, params)
+        if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            resp = Response(304)
+            resp.headers = {"ETag": etag}
+            return resp
+
+        key = (str(path), stamp, params)
+        if produce is None:
+            data = await self.store.fetch(key, path.read_bytes)
+        else:
+            data = await self.store.fetch(key, produce)
+
+        resp = Response(200, data, "image/jpeg" if path.suffix == ".jpg" else "application/xml")
+        resp.headers.update(
+            {
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "Accept-Ranges": "bytes",
+                "Last-Modified": formatdate(stamp[1] / 1e9, usegmt=True),
+            }
+        )
+        rng = headers.get("range")
+        if rng:
+            apply_range(resp, rng)
+        return resp
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for ln in lines[1:]:
+                    if ":" in ln:
+                        k, v = ln.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                try:
+                    resp = await self.respond(method, target, headers)
+                except HTTPError as e:
+                    resp = Response(e.status, (e.message + "\n").encode())
+                except Exception as e:  # keep serving other requests
+                    print(f"Error serving {target}: {e}", file=sys.stderr)
+                    resp = Response(500, b"Internal error\n")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                try:
+                    writer.write(serialize(resp, method == "HEAD", keep_alive))
+                    await writer.drain()
+                except ConnectionError:
+                    break  # client went away mid-response (e.g. a cancelled image load)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+
+def apply_range(resp: Response, header: str) -> None:
+    """Narrows a 200 response to a single 'bytes=' range (206) or marks it unsatisfiable (416)."""
+    m = re.match(r"^bytes=(\d*)-(\d*)$", header.strip())
+    size = len(resp.body)
+    if not m or m.group(1) == m.group(2) == "":
+        return  # multi-range or malformed: serve the whole body
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start = max(0, size - int(m.group(2)))
+        end = size - 1
+    if start >= size or start > end:
+        resp.status = 416
+        resp.headers["Content-Range"] = f"bytes */{size}"
+        resp.body = b""
+        return
+    resp.status = 206
+    resp.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    resp.body = resp.body[start : end + 1]
+
+
+REASONS = {200: "OK", 206: "Partial Content", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 416: "Range Not Satisfiable", 500: "Internal Server Error"}
+
+
+def serialize(resp: Response, head_only: bool, keep_alive: bool) -> bytes:
+    headers = dict(resp.headers)
+    headers["Content-Length"] = str(len(resp.body))
+    headers["Access-Control-Allow-Origin"] = "*"
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    lines = [f"HTTP/1.1 {resp.status} {REASONS.get(resp.status, '')}"]
+    lines += [f"{k}: {v}" for k, v in headers.items()]
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+    return head if head_only or resp.status == 304 else head + resp.body
+
+
+async def serve(host: str, port: int, store: ImageStore) -> None:
+    server = await asyncio.start_server(ImageServer(store).handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving images from {IMAGES_DIR} at http://{host}:{port}/ (Ctrl+C to stop)")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Serve page images, line crops, and tiles with in-memory caching")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default 127.0.0.1)")
+    p.add_argument("--port", type=int, default=8765, help="Port (default 8765)")
+    p.add_argument("--cache-mb", type=int, default=256, help="In-memory cache budget in MB (default 256)")
+    p.add_argument("--workers", type=int, default=4, help="Image worker threads (default 4)")
+    args = p.parse_args(argv)
+
+    store = ImageStore(args.cache_mb * 1024 * 1024, args.workers)
+    try:
+        asyncio.run(serve(args.host, args.port, store))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
@@ -0,0 +1,45 @@
+"""
+Repository layout shared by all journal tools.
+
+The repository root is taken from $JOURNAL_ROOT if set, else the nearest
+directory at or above the working directory that contains both TOC.md and
+transcripts/, else the checkout this package lives in.
+"""
+from __future__ import annotations
+import os
+import re
+from pathlib import Path
+
+
+def find_repo_root() -> Path:
+    env = os.environ.get("JOURNAL_ROOT")
+    if env:
+        return Path(env).expanduser().resolve()
+    cwd = Path.cwd().resolve()
+    for candidate in (cwd, *cwd.parents):
+        if (candidate / "TOC.md").is_file() and (candidate / "transcripts").is_dir():
+            return candidate
+    return Path(__file__).resolve().parents[1]
+
+
+REPO_ROOT = find_repo_root()
+TRANSCRIPTS_DIR = REPO_ROOT / "transcripts"
+DOCS_DIR = REPO_ROOT / "docs"
+PREFACE_FILE = REPO_ROOT / "Preface.md"
+TOC_FILE = REPO_ROOT / "TOC.md"
+
+IMAGES_DIR = REPO_ROOT / "images"
+LINES_DIR = IMAGES_DIR / "lines"
+PROCESSED_DIR = IMAGES_DIR / "processed"
+PROCESSED_FULL = IMAGES_DIR / "processed_full"
+PROCESSED_SAFE = IMAGES_DIR / "processed_safe_crop"
+TILES_DIR = IMAGES_DIR / "tiles"
+
+METADATA_DIR = REPO_ROOT / "metadata"
+DATE_MAP_FILE = METADATA_DIR / "date_mapping.json"
+INDEX_FILE = METADATA_DIR / "index.md"
+
+COMPILED_DIR = REPO_ROOT / "compiled"
+CACHE_DIR = REPO_ROOT / ".cache"
+
+DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})$")
@@ -0,0 +1,315 @@
+"""
+Perceptual-hash index for manuscript page images, used to verify that pages are
+where metadata says they are.
+
+Computes 64-bit aHash, dHash and pHash (NumPy DCT) for every page image in one
+batch: originals (images/*.jpg), derivatives (images/processed_full/,
+images/processed_safe_crop/) and, optionally, a folder of original camera files
+named as in metadata/date_mapping.json. Hashes are cached in
+.cache/phash/index.json and only recomputed for files whose size or mtime changed.
+
+Checks:
+- Each derivative is nearest to the original page of the same date (catches swapped pages)
+- No two dates share a near-identical original (catches duplicated pages)
+- date_mapping.json maps each date to a distinct camera file, and with --originals,
+  that camera file is the nearest match to images/DATE.jpg
+
+Near-duplicate lookups use a BK-tree; nearest-page searches use bit-packed
+Hamming distance over all hashes at once.
+
+Usage:
+  journal phash
+  journal phash --originals ~/Pictures/liberty-jail-originals
+  journal phash --query some_scan.jpg
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ._lazy import lazy_import
+from .paths import CACHE_DIR, DATE_MAP_FILE, DATE_RE, IMAGES_DIR, PROCESSED_FULL, PROCESSED_SAFE, REPO_ROOT
+from .validate_repository import Issue
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+
+DERIVATIVE_DIRS = [PROCESSED_FULL, PROCESSED_SAFE]
+CACHE_FILE = CACHE_DIR / "phash" / "index.json"
+HASH_KINDS = ("ahash", "dhash", "phash")
+# "combined" sums the three distances; it separates similar-looking pages far better than any one hash
+METRICS = HASH_KINDS + ("combined",)
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".tif", ".tiff"}
+# Bump when hashing changes so cached values are recomputed
+HASH_VERSION = 2
+
+@lru_cache(maxsize=None)
+def _popcount8():
+    return np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _dct_matrix(n: int):
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m
+
+
+def load_thumb(path: Path) -> Optional["np.ndarray"]:
+    """Decodes to grayscale at reduced resolution and returns a 32x32 float thumbnail."""
+    img = cv2.imread(str(path), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+    if img is None:
+        img = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    return cv2.resize(img, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def pack_bits(bits) -> "np.ndarray":
+    """Packs an (N, 64) boolean array into N unsigned 64-bit hashes."""
+    return np.packbits(bits.astype(np.uint8), axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def compute_hashes(thumbs) -> Dict[str, "np.ndarray"]:
+    """Batch aHash/dHash/pHash for an (N, 32, 32) stack of grayscale thumbnails."""
+    n = thumbs.shape[0]
+    a8 = np.stack([cv2.resize(t, (8, 8), interpolation=cv2.INTER_AREA) for t in thumbs])
+    ahash = (a8 > a8.mean(axis=(1, 2), keepdims=True)).reshape(n, 64)
+    small = np.stack([cv2.resize(t, (9, 8), interpolation=cv2.INTER_AREA) for t in thumbs])
+    dhash = (small[:, :, 1:] > small[:, :, :-1]).reshape(n, 64)
+    d = _dct_matrix(32)
+    dct = np.einsum("ij,njk,lk->nil", d, thumbs, d)[:, :8, :8].reshape(n, 64)
+    med = np.median(dct[:, 1:], axis=1, keepdims=True)  # skip the DC term
+    phash = dct > med
+    return {"ahash": pack_bits(ahash), "dhash": pack_bits(dhash), "phash": pack_bits(phash)}
+
+
+def hamming(a, b) -> "np.ndarray":
+    """Pairwise Hamming distances between uint64 hash arrays a (N,) and b (M,) -> (N, M)."""
+    x = np.bitwise_xor(a[:, None], b[None, :])
+    return _popcount8()[x.view(np.uint8).reshape(x.shape + (8,))].sum(axis=-1, dtype=np.int32)
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes for radius queries in Hamming space."""
+
+    def __init__(self):
+        self.root: Optional[list] = None  # [hash, key, {distance: child}]
+
+    def add(self, value: int, key: str) -> None:
+        if self.root is None:
+            self.root = [value, key, {}]
+            return
+        node = self.root
+        while True:
+            d = (node[0] ^ value).bit_count()
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, key, {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> List[Tuple[int, str]]:
+        found: List[Tuple[int, str]] = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = (node[0] ^ value).bit_count()
+            if d <= radius:
+                found.append((d, node[1]))
+            for cd, child in node[2].items():
+                if d - radius <= cd <= d + radius:
+                    stack.append(child)
+        return sorted(found)
+
+
+class HashIndex:
+    """Maps repository-relative (or absolute, for external files) paths to hashes."""
+
+    def __init__(self, entries: Dict[str, dict]):
+        self.entries = entries
+
+    @classmethod
+    def load(cls, path: Path = CACHE_FILE) -> "HashIndex":
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("version") == HASH_VERSION:
+                    return cls(data["entries"])
+            except (ValueError, KeyError):
+                pass
+        return cls({})
+
+    def save(self, path: Path = CACHE_FILE) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"version": HASH_VERSION, "entries": self.entries}, indent=0), encoding="utf-8")
+
+    def update(self, paths: Iterable[Path]) -> Tuple[int, List[Path]]:
+        """Hashes new or changed files in one batch. Returns (count hashed, unreadable files)."""
+        for key in [k for k in self.entries if not (REPO_ROOT / k).exists()]:
+            del self.entries[key]  # file deleted or renamed since it was hashed
+        stale: List[Tuple[str, Path, list]] = []
+        for p in paths:
+            st = p.stat()
+            stamp = [st.st_size, st.st_mtime_ns]
+            key = self.key(p)
+            cached = self.entries.get(key)
+            if cached is None or cached["stamp"] != stamp:
+                stale.append((key, p, stamp))
+        thumbs, keys, failed = [], [], []
+        for key, p, stamp in stale:
+            t = load_thumb(p)
+            if t is None:
+                failed.append(p)
+                continue
+            thumbs.append(t)
+            keys.append((key, stamp))
+        if thumbs:
+            hashes = compute_hashes(np.stack(thumbs))
+            for i, (key, stamp) in enumerate(keys):
+                self.entries[key] = {"stamp": stamp, **{k: f"{int(hashes[k][i]):016x}" for k in HASH_KINDS}}
+        return len(thumbs), failed
+
+    @staticmethod
+    def key(path: Path) -> str:
+        path = path.resolve()
+        try:
+            return path.relative_to(REPO_ROOT).as_posix()
+        except ValueError:
+            return str(path)
+
+    def hashes(self, keys: List[str], kind: str) -> "np.ndarray":
+        return np.array([int(self.entries[k][kind], 16) for k in keys], dtype=np.uint64)
+
+    def value(self, key: str, metric: str) -> int:
+        """One hash as a Python int; "combined" concatenates all three (192 bits)."""
+        kinds = HASH_KINDS if metric == "combined" else (metric,)
+        return int("".join(self.entries[key][k] for k in kinds), 16)
+
+    def distances(self, a: List[str], b: List[str], metric: str) -> "np.ndarray":
+        kinds = HASH_KINDS if metric == "combined" else (metric,)
+        return sum(hamming(self.hashes(a, k), self.hashes(b, k)) for k in kinds)
+
+
+def image_files(directory: Path) -> List[Path]:
+    if not directory.is_dir():
+        return []
+    return sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES and not p.name.startswith("."))
+
+
+def check(index: HashIndex, date_map: Dict[str, str], originals_dir: Optional[Path], metric: str, dup_radius: int) -> List[Issue]:
+    issues: List[Issue] = []
+    pages = [p for p in image_files(IMAGES_DIR) if DATE_RE.match(p.stem)]
+    page_keys = [index.key(p) for p in pages if index.key(p) in index.entries]
+    page_dates = [Path(k).stem for k in page_keys]
+    if not page_keys:
+        return issues
+
+    # Duplicated pages: any two dates whose originals are within dup_radius
+    tree = BKTree()
+    for key, date in zip(page_keys, page_dates):
+        h = index.value(key, metric)
+        for d, other in tree.query(h, dup_radius):
+            issues.append(Issue("duplicate", IMAGES_DIR / f"{date}.jpg", f"near-identical to {other}.jpg (distance {d})"))
+        tree.add(h, date)
+
+    # Swapped derivatives: each derivative's nearest original must be its own date
+    for ddir in DERIVATIVE_DIRS:
+        derivs = [p for p in image_files(ddir) if DATE_RE.match(p.stem) and index.key(p) in index.entries]
+        if not derivs:
+            continue
+        dist = index.distances([index.key(p) for p in derivs], page_keys, metric)
+        for p, row in zip(derivs, dist):
+            if p.stem not in page_dates:
+                issues.append(Issue("derivative", p, "no original page with this date"))
+                continue
+            own = row[page_dates.index(p.stem)]
+            best = int(row.argmin())
+            if row[best] < own:
+                issues.append(Issue(
+                    "derivative", p,
+                    f"closer to {page_dates[best]}.jpg (distance {row[best]}) than to its own original (distance {own})",
+                ))
+
+    # date_mapping.json: distinct camera files, and (with --originals) each one matches its page
+    seen: Dict[str, str] = {}
+    for date, camera in sorted(date_map.items()):
+        if camera in seen:
+            issues.append(Issue("metadata", DATE_MAP_FILE, f"{camera} mapped to both {seen[camera]} and {date}"))
+        seen[camera] = date
+    if originals_dir is not None:
+        by_name = {p.name: index.key(p) for p in image_files(originals_dir) if index.key(p) in index.entries}
+        for date, camera in sorted(date_map.items()):
+            if date not in page_dates:
+                continue
+            if camera not in by_name:
+                issues.append(Issue("metadata", originals_dir / camera, f"camera file for {date} not found"))
+                continue
+            row = index.distances([by_name[camera]], page_keys, metric)[0]
+            best = int(row.argmin())
+            # Strictly closer: identical duplicate pages tie and are reported separately
+            if row[best] < row[page_dates.index(date)]:
+                issues.append(Issue(
+                    "metadata", DATE_MAP_FILE,
+                    f"{camera} is mapped to {date} but looks like {page_dates[best]}.jpg "
+                    f"(distance {row[best]} vs {row[page_dates.index(date)]})",
+                ))
+    return issues
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Perceptual-hash index and page integrity checks")
+    p.add_argument("--originals", help="Folder of original camera files named as in date_mapping.json")
+    p.add_argument("--hash", choices=METRICS, default="combined", help="Hash used for comparisons (default combined)")
+    p.add_argument("--dup-radius", type=int, default=6, help="Max Hamming distance treated as a duplicate page (default 6)")
+    p.add_argument("--query", help="Print the pages nearest to this image and exit")
+    p.add_argument("--rebuild", action="store_true", help="Ignore cached hashes")
+    args = p.parse_args(argv)
+    query = Path(args.query).expanduser() if args.query else None
+    if query is not None and not query.is_file():
+        print(f"Image not found: {query}", file=sys.stderr)
+        return 1
+
+    index = HashIndex({}) if args.rebuild else HashIndex.load()
+    originals_dir = Path(args.originals).expanduser() if args.originals else None
+    targets = image_files(IMAGES_DIR)
+    for d in DERIVATIVE_DIRS:
+        targets += image_files(d)
+    if originals_dir is not None:
+        targets += image_files(originals_dir)
+    if query is not None:
+        targets.append(query)
+    hashed, failed = index.update(targets)
+    index.save()
+    for f in failed:
+        print(f"Failed to read {f}", file=sys.stderr)
+
+    if query is not None:
+        page_keys = [index.key(p) for p in image_files(IMAGES_DIR) if DATE_RE.match(p.stem)]
+        q = index.key(query)
+        if q not in index.entries:
+            return 1
+        row = index.distances([q], page_keys, args.hash)[0]
+        for i in row.argsort()[:5]:
+            print(f"{Path(page_keys[i]).stem}  distance {row[i]}")
+        return 0
+
+    date_map: Dict[str, str] = {}
+    if DATE_MAP_FILE.exists():
+        date_map = json.loads(DATE_MAP_FILE.read_text(encoding="utf-8"))
+    issues = check(index, date_map, originals_dir, args.hash, args.dup_radius)
+    print(f"Hashed {hashed} new or changed image(s); {len(index.entries)} in index.")
+    if issues:
+        print("Image integrity issues found:\n")
+        for i in issues:
+            print(str(i))
+        print(f"\nTotal issues: {len(issues)}")
+        return 1
+    print("All page images match their dates.")
+    return 0
+
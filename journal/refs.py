@@ -0,0 +1,53 @@
+"""
+Adds or updates derived image references in transcript frontmatter:
+- image_processed_ref -> ../images/processed_full/YYYY-MM-DD.jpg (enhanced full page)
+- image_working_ref   -> ../images/processed_safe_crop/YYYY-MM-DD.jpg (safe-cropped working image)
+
+Does not modify provenance `image_ref`.
+Idempotent: re-runnable; preserves existing fields and ordering where possible.
+
+Usage:
+  journal refs                 # both references
+  journal refs --only working
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from .paths import DATE_RE, TRANSCRIPTS_DIR
+from .transcript import set_frontmatter_field
+
+# kind -> (frontmatter key, target template, keys a newly added line may follow)
+REFS = {
+    "processed": ("image_processed_ref", "../images/processed_full/{date}.jpg", ("image_ref:",)),
+    "working": ("image_working_ref", "../images/processed_safe_crop/{date}.jpg", ("image_processed_ref:", "image_ref:")),
+}
+
+
+def process_file(path: Path, kind: str) -> bool:
+    date = path.stem
+    if not DATE_RE.match(date):
+        return False
+    text = path.read_text(encoding="utf-8")
+    key, template, anchors = REFS[kind]
+    target = '"' + template.format(date=date) + '"'
+    new_text = set_frontmatter_field(text, key, target, after=anchors)
+    if new_text != text:
+        path.write_text(new_text, encoding="utf-8")
+        return True
+    return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Add image_processed_ref / image_working_ref to transcript frontmatter")
+    p.add_argument("--only", choices=sorted(REFS), help="Update just one reference (default: both)")
+    args = p.parse_args(argv)
+
+    for kind in [args.only] if args.only else list(REFS):
+        changed = 0
+        for md in sorted(TRANSCRIPTS_DIR.glob("*.md")):
+            if process_file(md, kind):
+                changed += 1
+        print(f"Updated {changed} transcript(s) with {REFS[kind][0]}")
+    return 0
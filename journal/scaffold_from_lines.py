@@ -0,0 +1,108 @@
+"""
+Scaffold Diplomatic transcription from line crops by placing one image-per-line
+as markdown image references into the Diplomatic section for manual typing.
+This avoids relying on OCR for cursive while keeping line boundaries.
+
+Usage:
+  journal scaffold 1839-03-30
+
+Effect:
+- Inserts a skeletal structure in transcripts/DATE.md Diplomatic section:
+  [Line 001] ![](../images/lines/DATE/line_001.jpg)
+  (Transcribe here)
+
+Idempotent: will replace previously scaffolded block (between markers) to update order if needed.
+"""
+from __future__ import annotations
+import argparse
+from pathlib import Path
+import re
+import sys
+from typing import Dict, List, Optional
+
+from .paths import LINES_DIR, TRANSCRIPTS_DIR
+from .transcript import DIPLOMATIC_HEADER_RE, MODERNIZED_HEADER_RE, SCAFFOLD_END as END_MARK, SCAFFOLD_START as START_MARK
+
+LINE_LABEL_RE = re.compile(r"^\[Line \d+\]\s*!\[[^\]]*\]\((?:[^)]*/)?(line_\d+\.jpg)\)\s*$")
+
+
+def build_scaffold(date: str) -> str:
+    lines = sorted((LINES_DIR / date).glob("line_*.jpg"))
+    parts = [START_MARK]
+    for p in lines:
+        name = p.name.replace(".jpg", "")
+        parts.append(f"[Line {name.split('_')[-1]}] ![](../images/lines/{date}/{p.name})\n(Transcribe)\n")
+    parts.append(END_MARK)
+    return "\n".join(parts)
+
+
+def scaffold_lines(body: str) -> Dict[str, str]:
+    """Maps each line crop named in a scaffold block to the text typed under it.
+
+    Text is the `> ` quoted lines following a `[Line NNN]` label; crops still
+    marked (Transcribe) map to "". A crop labelled more than once collects the
+    text from every label. A block without an end marker runs to the end of `body`.
+    """
+    start = body.find(START_MARK)
+    if start < 0:
+        return {}
+    end = body.find(END_MARK, start)
+    block = body[start + len(START_MARK) : end if end >= 0 else len(body)]
+    texts: Dict[str, List[str]] = {}
+    current = None
+    for line in block.splitlines():
+        m = LINE_LABEL_RE.match(line.strip())
+        if m:
+            current = m.group(1)
+            texts.setdefault(current, [])
+        elif current and line.lstrip().startswith(">"):
+            text = line.lstrip()[1:].strip()
+            if text:
+                texts[current].append(text)
+    return {name: " ".join(parts) for name, parts in texts.items()}
+
+
+def insert_scaffold(md_path: Path, scaffold: str) -> bool:
+    text = md_path.read_text(encoding="utf-8")
+    # Locate Diplomatic section header
+    m = DIPLOMATIC_HEADER_RE.search(text)
+    if not m:
+        return False
+    start = m.end()
+    # Find next section or end
+    n = MODERNIZED_HEADER_RE.search(text)
+    end = n.start() if n else len(text)
+    body = text[start:end]
+
+    # Replace existing scaffold block if present, else prepend to section body
+    if START_MARK in body and END_MARK in body:
+        new_body = re.sub(rf"{START_MARK}.*?{END_MARK}", scaffold, body, flags=re.S)
+    else:
+        new_body = "\n\n" + scaffold + "\n\n" + body
+
+    new_text = text[:start] + new_body + text[end:]
+    if new_text != text:
+        md_path.write_text(new_text, encoding="utf-8")
+        return True
+    return False
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Scaffold the Diplomatic section from line crops")
+    p.add_argument("date", help="YYYY-MM-DD date to scaffold")
+    date = p.parse_args(argv).date
+    md = TRANSCRIPTS_DIR / f"{date}.md"
+    if not md.exists():
+        print(f"Transcript not found: {md}", file=sys.stderr)
+        return 1
+    if not (LINES_DIR / date).exists():
+        print(f"No line crops found: {LINES_DIR/date}", file=sys.stderr)
+        return 1
+    scaffold = build_scaffold(date)
+    changed = insert_scaffold(md, scaffold)
+    if changed:
+        print(f"Inserted scaffold into {md}")
+    else:
+        print("No changes (already up-to-date)")
+    return 0
+
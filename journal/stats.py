@@ -0,0 +1,246 @@
+"""
+Corpus statistics and concordance for the transcripts.
+
+Tokenizes the Diplomatic and Modernized sections of every transcript, fills in
+the `word_count:` frontmatter field (Diplomatic words, editorial apparatus
+excluded), and maintains a SQLite store under .cache/stats/ with:
+- every token with its position and line in the file (the concordance)
+- per-term frequencies for each section, adjusted by deltas as entries change
+
+Entries are processed one at a time and skipped when their content hash is
+unchanged, so an update touches only edited transcripts and memory stays
+bounded by one entry.
+
+Usage:
+  journal stats                          # update, fill word_count, print summary
+  journal stats --top 30 --section modernized
+  journal stats --kwic brother           # keyword in context (Diplomatic)
+  journal stats --kwic "deliv*" --section modernized --width 8
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .paths import CACHE_DIR, DATE_RE, TRANSCRIPTS_DIR
+from .transcript import count_words, diplomatic_body, modernized_body, parse_frontmatter, set_frontmatter_field, tokenize
+
+DB_FILE = CACHE_DIR / "stats" / "corpus.sqlite"
+# Bump when tokenization or the schema changes so the store is rebuilt
+SCHEMA_VERSION = "4"
+SECTIONS = ("diplomatic", "modernized")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS entries (
+    date TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    diplomatic_words INTEGER NOT NULL,
+    modernized_words INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tokens (
+    date TEXT NOT NULL,
+    section TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    line INTEGER NOT NULL,  -- line in the transcript file
+    surface TEXT NOT NULL,
+    norm TEXT NOT NULL,
+    PRIMARY KEY (date, section, pos)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS tokens_norm ON tokens (norm, section);
+CREATE TABLE IF NOT EXISTS term_freq (
+    norm TEXT NOT NULL,
+    section TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (norm, section)
+) WITHOUT ROWID;
+"""
+
+
+def normalize(token: str) -> str:
+    return token.lower().replace("’", "'")
+
+
+class CorpusStore:
+    def __init__(self, path: Path = DB_FILE, rebuild: bool = False):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        version = None
+        if not rebuild:
+            try:
+                row = self.db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+                version = row[0] if row else None
+            except sqlite3.OperationalError:
+                pass
+        if version != SCHEMA_VERSION:
+            self.db.executescript(
+                "DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS entries;"
+                "DROP TABLE IF EXISTS tokens; DROP TABLE IF EXISTS term_freq;"
+            )
+        self.db.executescript(SCHEMA)
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (SCHEMA_VERSION,))
+        self.db.commit()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def entry(self, date: str) -> Optional[Tuple[str, int]]:
+        """(content digest, Diplomatic word count) stored for an entry."""
+        return self.db.execute("SELECT digest, diplomatic_words FROM entries WHERE date = ?", (date,)).fetchone()
+
+    def _drop_entry(self, date: str) -> None:
+        old = self.db.execute(
+            "SELECT norm, section, COUNT(*) FROM tokens WHERE date = ? GROUP BY norm, section", (date,)
+        ).fetchall()
+        self.db.executemany(
+            "UPDATE term_freq SET count = count - ? WHERE norm = ? AND section = ?",
+            [(c, norm, section) for norm, section, c in old],
+        )
+        self.db.execute("DELETE FROM term_freq WHERE count <= 0")
+        self.db.execute("DELETE FROM tokens WHERE date = ?", (date,))
+        self.db.execute("DELETE FROM entries WHERE date = ?", (date,))
+
+    def replace_entry(self, date: str, digest: str, sections: List[Tuple[str, List[Tuple[int, str]]]]) -> None:
+        """Swaps an entry's tokens and applies the term-frequency delta in one transaction."""
+        with self.db:
+            self._drop_entry(date)
+            counts: Counter = Counter()
+            rows = []
+            for section, tokens in sections:
+                for pos, (line, surface) in enumerate(tokens):
+                    norm = normalize(surface)
+                    rows.append((date, section, pos, line, surface, norm))
+                    counts[(norm, section)] += 1
+            self.db.executemany("INSERT INTO tokens VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany(
+                "INSERT INTO term_freq VALUES (?, ?, ?) "
+                "ON CONFLICT (norm, section) DO UPDATE SET count = count + excluded.count",
+                [(norm, section, c) for (norm, section), c in counts.items()],
+            )
+            words = dict((s, len(t)) for s, t in sections)
+            self.db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                (date, digest, words.get("diplomatic", 0), words.get("modernized", 0)),
+            )
+
+    def prune(self, keep: set) -> int:
+        stale = [d for (d,) in self.db.execute("SELECT date FROM entries") if d not in keep]
+        with self.db:
+            for d in stale:
+                self._drop_entry(d)
+        return len(stale)
+
+    # --- queries
+
+    def totals(self) -> Tuple[int, int, int]:
+        row = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(diplomatic_words), 0), COALESCE(SUM(modernized_words), 0) FROM entries"
+        ).fetchone()
+        return row[0], row[1], row[2]
+
+    def vocabulary_size(self, section: str) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM term_freq WHERE section = ?", (section,)).fetchone()[0]
+
+    def top_terms(self, section: str, n: int) -> List[Tuple[str, int]]:
+        return self.db.execute(
+            "SELECT norm, count FROM term_freq WHERE section = ? ORDER BY count DESC, norm LIMIT ?", (section, n)
+        ).fetchall()
+
+    def kwic(self, term: str, section: str, width: int, limit: int) -> Iterator[Tuple[str, int, str, str, str]]:
+        """Yields (date, file line, left context, keyword, right context); a trailing * matches a prefix."""
+        term = normalize(term)
+        if term.endswith("*"):
+            prefix = term[:-1]
+            hits = self.db.execute(
+                "SELECT date, pos, line FROM tokens WHERE norm >= ? AND norm < ? AND section = ? "
+                "ORDER BY date, pos LIMIT ?",
+                (prefix, prefix + "\uffff", section, limit),
+            )
+        else:
+            hits = self.db.execute(
+                "SELECT date, pos, line FROM tokens WHERE norm = ? AND section = ? ORDER BY date, pos LIMIT ?",
+                (term, section, limit),
+            )
+        for date, pos, line in hits.fetchall():
+            window = self.db.execute(
+                "SELECT pos, surface FROM tokens WHERE date = ? AND section = ? AND pos BETWEEN ? AND ? ORDER BY pos",
+                (date, section, pos - width, pos + width),
+            ).fetchall()
+            left = " ".join(s for p, s in window if p < pos)
+            key = next(s for p, s in window if p == pos)
+            right = " ".join(s for p, s in window if p > pos)
+            yield date, line, left, key, right
+
+
+def file_tokens(text: str, body: str) -> List[Tuple[int, str]]:
+    """Tokens of a section body, numbered by their line in the transcript file."""
+    offset = text.count("\n", 0, text.find(body)) if body else 0
+    return [(offset + n, word) for n, word in tokenize(body)]
+
+
+def update_corpus(store: CorpusStore, write_counts: bool = True) -> Tuple[int, int]:
+    """Streams transcripts into the store. Returns (entries re-indexed, files rewritten)."""
+    indexed = rewritten = 0
+    seen = set()
+    for md in sorted(TRANSCRIPTS_DIR.glob("*.md")):
+        date = md.stem
+        if not DATE_RE.match(date):
+            continue
+        seen.add(date)
+        text = md.read_text(encoding="utf-8")
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        stored = store.entry(date)
+        if stored and stored[0] == digest:
+            # Unchanged, unless a --no-write run left word_count unfilled or stale
+            if not write_counts or parse_frontmatter(text)[0].get("word_count") == str(stored[1]):
+                continue
+        if write_counts:
+            new_text = set_frontmatter_field(text, "word_count", str(count_words(diplomatic_body(text))))
+            if new_text != text:
+                md.write_text(new_text, encoding="utf-8")
+                text = new_text
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                rewritten += 1
+        dip = file_tokens(text, diplomatic_body(text))
+        mod = file_tokens(text, modernized_body(text))
+        store.replace_entry(date, digest, [("diplomatic", dip), ("modernized", mod)])
+        indexed += 1
+    store.prune(seen)
+    return indexed, rewritten
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Corpus statistics, word counts, and keyword-in-context search")
+    p.add_argument("--section", choices=SECTIONS, default="diplomatic", help="Section to report on (default diplomatic)")
+    p.add_argument("--top", type=int, default=20, help="Number of most frequent terms to list (default 20)")
+    p.add_argument("--kwic", metavar="TERM", help="Show TERM in context (trailing * matches a prefix)")
+    p.add_argument("--width", type=int, default=5, help="Context words on each side for --kwic (default 5)")
+    p.add_argument("--limit", type=int, default=100, help="Max --kwic hits (default 100)")
+    p.add_argument("--no-write", action="store_true", help="Do not update word_count in transcript frontmatter (--kwic never does)")
+    p.add_argument("--rebuild", action="store_true", help="Discard the stored index and re-tokenize everything")
+    args = p.parse_args(argv)
+
+    store = CorpusStore(rebuild=args.rebuild)
+    try:
+        # A concordance lookup is read-only: it refreshes the index but leaves transcripts alone
+        indexed, rewritten = update_corpus(store, write_counts=not (args.no_write or args.kwic))
+        if args.kwic:
+            hits = list(store.kwic(args.kwic, args.section, args.width, args.limit))
+            pad = max((len(h[2]) for h in hits), default=0)
+            for date, line, left, key, right in hits:
+                print(f"{date}:{line:<3} {left.rjust(pad)} [{key}] {right}")
+            print(f"\n{len(hits)} hit(s) for '{args.kwic}' in {args.section} text")
+            return 0
+
+        entries, dip_words, mod_words = store.totals()
+        print(f"Re-indexed {indexed} entr{'y' if indexed == 1 else 'ies'}; updated word_count in {rewritten} file(s).")
+        print(f"{entries} entries: {dip_words} diplomatic words, {mod_words} modernized words")
+        print(f"Vocabulary ({args.section}): {store.vocabulary_size(args.section)} distinct terms\n")
+        for term, count in store.top_terms(args.section, args.top):
+            print(f"{count:>6}  {term}")
+        return 0
+    finally:
+        store.close()
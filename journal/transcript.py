@@ -0,0 +1,165 @@
+"""
+Parsing helpers for transcripts/YYYY-MM-DD.md files: simple YAML-like
+frontmatter, the Diplomatic / Modernized section bodies, and word tokens.
+"""
+from __future__ import annotations
+import re
+from typing import Dict, Iterator, Pattern, Sequence, Tuple
+
+FRONTMATTER_DELIM = re.compile(r"^---\s*$", re.M)
+DIPLOMATIC_HEADER_RE = re.compile(r"^###\s+Faithful\s*\(Diplomatic\)\s*Transcription\s*$", re.M)
+MODERNIZED_HEADER_RE = re.compile(r"^###\s+Modernized\s*\(Readable\)\s*Transcription\s*$", re.M)
+SCAFFOLD_START = "<!-- SCAFFOLD_START -->"
+SCAFFOLD_END = "<!-- SCAFFOLD_END -->"
+# Working apparatus: the editor's copy only, never published or counted
+APPARATUS = (
+    r"(?s:<!--.*?-->)"                  # scaffold markers / comments
+    r"|!\[[^\]]*\]\([^)]*\)"            # image references
+    r"|\[Line \d+\]"                    # scaffold line labels
+    r"|^Reference image.*$"             # working image caption
+    r"|^Transcription draft in progress\.?"
+    r"|\(Transcribe\)"
+)
+APPARATUS_RE = re.compile(APPARATUS, re.M)
+# Editorial apparatus that should not count as manuscript words (but is published)
+NON_TEXT_RE = re.compile(
+    APPARATUS
+    + r"|\[Liberty Jail,[^\]]*\]"       # page headers
+    r"|\[End of page[^\]]*\]"           # page footers
+    r"|\[(?:illegible|torn)\]",          # unreadable passages (no word to count)
+    re.M,
+)
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*")
+# Editor-supplied letters inside a word, e.g. Whitn[e]y
+SUPPLIED_RE = re.compile(r"(?<=[A-Za-z])\[([A-Za-z]+)\]|\[([A-Za-z]+)\](?=[A-Za-z])")
+
+
+def parse_frontmatter(text: str) -> Tuple[Dict[str, str], int]:
+    """Parses simple YAML-like frontmatter delimited by lines with '---'. Returns (mapping, end_index)."""
+    lines = text.splitlines()
+    start = None
+    for i, line in enumerate(lines[:20]):
+        if line.strip() == "---":
+            if start is None:
+                start = i
+            else:
+                end = i
+                break
+    else:
+        return {}, -1
+
+    mapping: Dict[str, str] = {}
+    for line in lines[start + 1 : end]:
+        if not line.strip() or line.strip().startswith("#"):
+            continue
+        if ":" in line:
+            key, val = line.split(":", 1)
+            mapping[key.strip()] = val.strip().strip('"')
+    return mapping, end
+
+
+def diplomatic_body(text: str) -> str:
+    """Text between the Diplomatic header and the Modernized header (or end of file)."""
+    m = DIPLOMATIC_HEADER_RE.search(text)
+    if not m:
+        return ""
+    n = MODERNIZED_HEADER_RE.search(text, m.end())
+    return text[m.end() : n.start() if n else len(text)]
+
+
+def modernized_body(text: str) -> str:
+    """Text after the Modernized header, up to the closing '---' rule before the edition credit."""
+    m = MODERNIZED_HEADER_RE.search(text)
+    if not m:
+        return ""
+    return re.split(r"^---\s*$", text[m.end() :], maxsplit=1, flags=re.M)[0]
+
+
+def set_frontmatter_field(text: str, key: str, value: str, after: Sequence[str] = ()) -> str:
+    """Sets `key: value` in the frontmatter block, replacing an existing line.
+
+    A new key is inserted after the first line starting with one of `after`
+    (e.g. "image_ref:"), else at the top of the block. Text without a
+    frontmatter block is returned unchanged.
+    """
+    m = list(FRONTMATTER_DELIM.finditer(text))
+    if len(m) < 2:
+        return text
+    start, end = m[0].end(), m[1].start()
+    lines = text[start:end].splitlines()
+
+    found = False
+    new_lines = []
+    for line in lines:
+        if line.strip().startswith(key + ":"):
+            new_lines.append(f"{key}: {value}")
+            found = True
+        else:
+            new_lines.append(line)
+    if not found:
+        inserted = False
+        out = []
+        for line in new_lines:
+            out.append(line)
+            if not inserted and after and line.strip().startswith(tuple(after)):
+                out.append(f"{key}: {value}")
+                inserted = True
+        if not inserted:
+            out.insert(0, f"{key}: {value}")
+        new_lines = out
+
+    new_fm = "\n".join(new_lines)
+    # Ensure the frontmatter content ends with a newline so the closing '---' stays on its own line
+    if not new_fm.endswith("\n"):
+        new_fm += "\n"
+    return text[:start] + new_fm + text[end:]
+
+
+def published_text(body: str) -> str:
+    r"""Section body as printed in the edition: working apparatus removed.
+
+    Lines holding only apparatus (scaffold labels, placeholders, captions) are
+    dropped whole, as are the blank spacer lines inside a scaffold block, so the
+    transcribed lines of a page stay together as one passage.
+
+    >>> published_text("<!-- SCAFFOLD_START -->\n[Line 001] ![](l1.jpg)\n> one\n\n"
+    ...                "[Line 002] ![](l2.jpg)\n(Transcribe)\n<!-- SCAFFOLD_END -->\n\nafter\n")
+    '> one\n\nafter\n'
+    """
+    # Mark every line apparatus touched (comments may span lines), keeping line count
+    marked = APPARATUS_RE.sub(lambda m: "\0" + "\n\0" * m.group(0).count("\n"), body)
+    scaffold = range(0)  # line numbers inside the scaffold block
+    start = body.find(SCAFFOLD_START)
+    if start >= 0:
+        end = body.find(SCAFFOLD_END, start)
+        scaffold = range(body.count("\n", 0, start), body.count("\n", 0, end if end >= 0 else len(body)) + 1)
+    out = []
+    for n, line in enumerate(marked.splitlines(keepends=True)):
+        text = line.replace("\0", "")
+        if text.strip():
+            out.append(text)
+        elif "\0" not in line and n not in scaffold:
+            out.append(line)  # blank line that separates paragraphs
+    return "".join(out)
+
+
+def tokenize(body: str, pattern: Pattern[str] = WORD_RE) -> Iterator[Tuple[int, str]]:
+    """Yields (line number within body, word) for manuscript words, skipping editorial apparatus."""
+    # Strip apparatus from the whole body so comments spanning lines are caught,
+    # keeping their newlines so later line numbers are unchanged
+    text = NON_TEXT_RE.sub(lambda m: " " + "\n" * m.group(0).count("\n"), body)
+    for n, line in enumerate(text.splitlines(), start=1):
+        line = SUPPLIED_RE.sub(lambda m: m.group(1) or m.group(2), line)
+        for m in pattern.finditer(line):
+            yield n, m.group(0)
+
+
+def count_words(body: str) -> int:
+    r"""Number of manuscript words in a section body.
+
+    >>> count_words("<!-- editor note:\nthis is not manuscript text\n-->\nreal words here")
+    3
+    >>> list(tokenize("<!-- a\nb -->\nsecond [Line 002] line"))
+    [(3, 'second'), (3, 'line')]
+    """
+    return sum(1 for _ in tokenize(body))
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""Compatibility wrapper for `journal serve` (see journal/image_server.py)."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from journal.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["serve", *sys.argv[1:]]))